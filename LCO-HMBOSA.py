@@ -7,25 +7,39 @@ Created on Tue Dec 13 14:19 2022
 """
 
 import sys, time, ctypes, os.path
-import threading
 import json
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
-from PyQt5 import uic
-from PyQt5.QtCore import Qt, QObject, QTimer, QDir
-from PyQt5.QtWidgets import QApplication, QFileDialog, QWidget, QSpinBox, QDoubleSpinBox, QCheckBox, QComboBox, QRadioButton, QMessageBox
+from PyQt5.QtCore import Qt, QObject, QTimer, QDir, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QWidget, QSpinBox, QDoubleSpinBox, QCheckBox, QComboBox, QRadioButton, QMessageBox
 from PyQt5.QtGui import QIcon
 
-from remotevisa import CommsManager
-from agilent816xb import Agilent816xb
-from keysightDSOX1200 import KeysightDSOX1200
+from bosa import BosaEngine, sweep_settings
+from acquisition import Spectrum
+# matplotlib is imported in SetupGraph, once the window is already on screen
+
+
+def load_form_ui():
+    # The class pre-generated with "pyuic5 MainWindow.ui -o MainWindow_ui.py" loads much faster
+    # than parsing the .ui file, which is only done if the generated one is missing or older
+    here = os.path.dirname(os.path.abspath(__file__))
+    ui_file = os.path.join(here, "MainWindow.ui")
+    py_file = os.path.join(here, "MainWindow_ui.py")
+    if os.path.isfile(py_file) and os.path.getmtime(py_file) >= os.path.getmtime(ui_file):
+        from MainWindow_ui import Ui_MainWindow
+        return Ui_MainWindow
+    else:
+        from PyQt5 import uic
+        return uic.loadUiType(ui_file)[0]
 
-FormUI, WindowUI = uic.loadUiType("MainWindow.ui")
+FormUI = load_form_ui()
 
 
-class MainWindow(FormUI, WindowUI):
+class MainWindow(FormUI, QMainWindow):
+    # Emitted from worker threads, delivered on the GUI thread
+    spectrumReady = pyqtSignal()
+    statusReady = pyqtSignal(str)
+    devicesReady = pyqtSignal(bool, bool)
 
     def __init__(self):
         super(MainWindow, self).__init__()
@@ -37,15 +51,16 @@ class MainWindow(FormUI, WindowUI):
         self.inited = False
         self.recalc = False
         self.frecalc = False
-        self.osc_started = False
-        self.osc_stb0 = -1
-        self.osc_stb_changes = 0
         self.sweeping = False
         self.has_data = False
-        self.busy = False
-        self.willstop = False
         self.autorange_started = False
         self.autorange_approach = False
+        self.max_fps = 20.0
+        self.renderer = None
+        self.t_start = time.perf_counter()
+        self.t_window = 0.0
+        self.t_graph = 0.0
+        self.t_devices = 0.0
 
         self.c = 2.99792458e5
         self.minWl = 1494.0
@@ -62,11 +77,10 @@ class MainWindow(FormUI, WindowUI):
         self.wls = np.zeros(101)
         self.freqs = np.zeros(101)
         self.y_results = np.zeros(101)
-        self.volts = np.zeros(101)
-        self.mW = np.zeros(101)
-        self.dbm = np.zeros(101)
-        self.avgs = []
-        self.avgn = 1
+        self.spectrum = Spectrum(self.wls, self.freqs, np.zeros(101), has_data=False)
+
+        # Hardware, driven from its own threads
+        self.engine = BosaEngine(self.spectrumReady.emit, self.statusReady.emit)
         
       
         # Set up
@@ -78,13 +92,24 @@ class MainWindow(FormUI, WindowUI):
         self.show()
         resizeEvent = self.OnWindowResize
         self.setWindowIcon(QIcon("spectrum.ico"))
+        self.t_window = time.perf_counter() - self.t_start
 
-        # Devices
-        self.commsMan = CommsManager()
-        self.osc = None
-        self.laser = None
+        # Devices connect in the background, and the plot is built on the first event loop pass
         self.InitializeDevices()
-        self.UpdateGraph()
+        QTimer.singleShot(0, self.SetupGraph)
+
+    # Converted from the averaged codes only when first used
+    @property
+    def volts(self):
+        return self.spectrum.volts
+
+    @property
+    def mW(self):
+        return self.spectrum.mW
+
+    @property
+    def dbm(self):
+        return self.spectrum.dbm
 
     def OnWindowResize(self, event):
         pass
@@ -92,7 +117,20 @@ class MainWindow(FormUI, WindowUI):
     def setupOtherUi(self):
         self.statusbar.showMessage(f"Initializing...")
 
-        self.figure = plt.figure()
+        if self.nmRadio.isChecked():
+            self.xscaleStack.setCurrentIndex(0)
+        elif self.thzRadio.isChecked():
+            self.xscaleStack.setCurrentIndex(1)
+
+        self.autorangeCheck.setChecked(False)
+
+    def SetupGraph(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+        from rendering import BlitPlot, RenderScheduler
+
+        self.figure = Figure()
         self.graph = FigureCanvas(self.figure)
         self.graphToolbar = NavigationToolbar(self.graph, self)
         self.graphHolder.addWidget(self.graphToolbar)
@@ -104,14 +142,15 @@ class MainWindow(FormUI, WindowUI):
         self.graph_ax.set_title("Brillouin Spectrum")
         self.graph_ax.grid(True)
         self.graph_ax.get_xaxis().get_major_formatter().set_useOffset(False)
+        self.plot = BlitPlot(self.figure, self.graph_ax, self.graph_line)
+        self.renderer = RenderScheduler(self.graph, self.RenderFrame, self.max_fps)
         self.graph.draw()
+        self.RequestRender()
+        self.t_graph = time.perf_counter() - self.t_start
 
-        if self.nmRadio.isChecked():
-            self.xscaleStack.setCurrentIndex(0)
-        elif self.thzRadio.isChecked():
-            self.xscaleStack.setCurrentIndex(1)
-
-        self.autorangeCheck.setChecked(False)
+    def RequestRender(self):
+        if self.renderer is not None:
+            self.renderer.Request()
 
     def SetupActions(self):
         # Buttons and etc
@@ -127,12 +166,19 @@ class MainWindow(FormUI, WindowUI):
         self.centerfSpin.valueChanged.connect(self.OnFreqChanged)
         self.spanfSpin.valueChanged.connect(self.OnFreqChanged)
         self.speedSpin.valueChanged.connect(self.OnSpeedChanged)
+        self.llogCheck.toggled.connect(self.OnSpeedChanged)
+        self.stepSpin.valueChanged.connect(self.OnSpeedChanged)
+        self.dwellSpin.valueChanged.connect(self.OnSpeedChanged)
         self.powerSpin.valueChanged.connect(self.OnPowerChanged)
         self.oscchanSpin.valueChanged.connect(self.OnOscYChanged)
         self.couplingCombo.currentIndexChanged.connect(self.OnOscYChanged)
         self.rangeSpin.valueChanged.connect(self.OnOscYChanged)
         self.offsetSpin.valueChanged.connect(self.OnOscYChanged)
         self.avgSpin.valueChanged.connect(self.OnAvgChanged)
+        self.avgmodeCombo.currentIndexChanged.connect(self.OnAvgChanged)
+        self.avgonCombo.currentIndexChanged.connect(self.OnAvgChanged)
+        self.calSpin.valueChanged.connect(self.OnProcessingChanged)
+        self.dbclipSpin.valueChanged.connect(self.OnProcessingChanged)
         self.autorangeCheck.toggled.connect(self.OnAutoRangeToggled)
         self.triggerCombo.currentIndexChanged.connect(self.OnTriggerChanged)
         self.triglvSpin.valueChanged.connect(self.OnTriggerChanged)
@@ -146,27 +192,24 @@ class MainWindow(FormUI, WindowUI):
         self.actionSave_config.triggered.connect(self.OnSaveSettings)
         self.actionLoad_config.triggered.connect(self.OnLoadSettings)
         self.actionSave_final_results.triggered.connect(self.OnSaveResults)
+        self.actionCalibrate_latency.triggered.connect(self.OnCalibrateLatency)
         self.actionExit.triggered.connect(self.Exit)
         self.actionAbout.triggered.connect(self.About)
 
-        # Timers
-        self.measTimer = QTimer()
-        self.measTimer.timeout.connect(self.measLoop)
-        self.measTimer.setInterval(1000)
+        # Acquisition thread
+        self.spectrumReady.connect(self.OnSpectrum)
+        self.statusReady.connect(self.statusbar.showMessage)
+        self.devicesReady.connect(self.OnDevicesReady)
 
     def InitializeDevices(self):
+        # Connecting can take seconds, so it runs off the GUI thread and reports with devicesReady
         self.statusbar.showMessage(f"Initializing...")
+        threading.Thread(target=lambda: self.devicesReady.emit(*self.engine.Connect()), daemon=True).start()
+
+    def OnDevicesReady(self, osc_ok, laser_ok):
         error_text = ""
         statusmsg = ""
 
-        # Start communications
-        self.commsMan.StartCommunications("143.106.153.67", 8080)
-        self.commsMan.ResetVisa()
-
-        self.osc = KeysightDSOX1200(True, self.commsMan)
-        self.osc.connect()
-        osc_ok = self.osc.devOK
-        self.osc.dev.timeout = 10000
         if osc_ok:
             statusmsg += "Oscilloscope OK! "
         else:
@@ -174,9 +217,6 @@ class MainWindow(FormUI, WindowUI):
                            "Check if it is connected and succesfully detected by the computer!\n\n")
             statusmsg += "Oscilloscope ERROR! "
         
-        self.laser = Agilent816xb(True, self.commsMan)
-        self.laser.connect(True, 20, False)
-        laser_ok = self.laser.devOK
         if laser_ok:
             statusmsg += "Laser OK! "
         else:
@@ -184,7 +224,7 @@ class MainWindow(FormUI, WindowUI):
                            "Check if it is connected and succesfully detected by the computer!\n\n")
             statusmsg += "Laser ERROR! "
         
-        if self.osc.devOK and self.laser.devOK:
+        if osc_ok and laser_ok:
             statusmsg = "Devices OK!"
 
         # Devices status
@@ -198,171 +238,77 @@ class MainWindow(FormUI, WindowUI):
 
         self.statusbar.showMessage(statusmsg)
         self.inited = True
+        self.t_devices = time.perf_counter() - self.t_start
         
     def Run(self):
         if not self.sweeping and self.inited:
             self.statusbar.showMessage(f"Preparing...")
 
-            self.willstop = False
-            self.OnAvgChanged()
-            
-            sw_start = self.startSpin.value()
-            sw_stop = self.stopSpin.value()
-            sw_speed = self.speedSpin.value()
-
-            self.laser.setState(0, True)
-            self.laser.setPwr(0, self.powerSpin.value())
-            self.laser.setSweep(0, 'CONT', sw_start, sw_stop, 1, 0, 0, sw_speed)
-            self.laser.setSweepState(0, "Start")
-
-            sw_time = (sw_stop - sw_start)/sw_speed
-            time_range = 1.1*sw_time
-            time_delay = sw_time/10.0
-
-            chan = self.oscchanSpin.value()
-            self.osc.dev.clear()
-            self.osc.SetTimeMode("MAIN")
-            self.osc.SetAcqMode("RTIM")
-            self.osc.SetTimeRef("LEFT")
-            self.osc.SetProbe(1, chan)
-            self.osc.SetTriggerMode("EDGE")
-            self.osc.SetTriggerSlope("POS")
-            self.osc.SetTriggerSweep("NORM")
-            self.osc.SetTimeRange(time_range)
-            self.osc.SetTimeDelay(time_delay)
-
-            self.osc.SetAcqType(self.acqCombo.currentText())
-            self.osc.SetCoupling(chan, self.couplingCombo.currentText())
-            self.osc.SetRange(self.rangeSpin.value(), chan)
-            self.osc.SetOffset(self.offsetSpin.value(), chan)
-            self.osc.SetTriggerSource(self.triggerCombo.currentText())
-            self.osc.SetTriggerLevel(self.triglvSpin.value())
-            self.osc_started = False
-            self.osc_stb0 = -1
-            self.osc_stb_changes = 0
+            self.engine.Start(self.SweepSettings(), self.avgSpin.value(), self.avgmodeCombo.currentText(),
+                              self.calSpin.value(), self.dbclipSpin.value(), self.avgonCombo.currentText())
 
             self.sweeping = True
-            self.UpdateGraph()
-            self.measTimer.setInterval(200)
-            self.measTimer.start()
+            self.RequestRender()
 
             self.statusbar.showMessage(f"Running...")
 
-    def threadLoop(self):
-        self.busy = True
-
-        if not self.osc_started:
-            self.osc.PrepareWait()
-            self.osc.Digitize()
-            self.osc.dev.write("*OPC")
-            self.osc_stb0 = -1
-            self.osc_stb_changes = 0
-            self.osc_started = True
+    def SweepSettings(self):
+        # Snapshot of the widgets, taken on the GUI thread for the engine
+        return sweep_settings(self.startSpin.value(), self.stopSpin.value(), self.speedSpin.value(),
+                              self.powerSpin.value(), self.oscchanSpin.value(), self.couplingCombo.currentText(),
+                              self.rangeSpin.value(), self.offsetSpin.value(), self.acqCombo.currentText(),
+                              self.triggerCombo.currentText(), self.triglvSpin.value(),
+                              lambda_log=self.llogCheck.isChecked(), step=self.stepSpin.value()*1e-3,
+                              dwell=self.dwellSpin.value()*1e-3)
+
+    def OnSpectrum(self):
+        # The spectrum itself is taken when the frame is drawn, so only the newest is shown
+        self.RequestRender()
+
+    def RenderFrame(self):
+        spectrum = self.engine.TakeSpectrum()
+        if spectrum is not None and self.sweeping:
+            self.spectrum = spectrum
+            self.wls = spectrum.wls
+            self.freqs = spectrum.freqs
+            self.has_data = spectrum.has_data
+            self.AutoRangeOffs()
+        self.UpdateGraph()
 
-            self.statusbar.showMessage(f"Starting acquisition...")
-        else:
-            stb = int(self.osc.dev.read_stb())
-            if self.osc_stb0 < 0:
-                self.osc_stb0 = stb
-            else:
-                if stb != self.osc_stb0:
-                    self.osc_stb0 = stb
-                    self.osc_stb_changes += 1
-                else:
-                    if stb == 165:
-                        self.osc.dev.clear()
-                        self.osc_started = False
-                        self.busy = False
-                        return              
-
-                if self.osc_stb_changes > 0:
-                    self.statusbar.showMessage(f"Acquisition complete!")
-
-                    self.osc.dev.query("*ESR?")
-
-                    data_t = self.osc.GetDataX(self.oscchanSpin.value())
-                    data_wl = self.startSpin.value() + data_t*self.speedSpin.value()
-                    start_index = np.abs(data_wl - self.startSpin.value()).argmin()
-                    stop_index = np.abs(data_wl - self.stopSpin.value()).argmin() + 1
-                    data_y = self.osc.GetDataY_BIN(self.oscchanSpin.value())
-
-                    if data_t.min() != data_t.max:
-                        self.has_data = True
-                    else:
-                        self.has_data = False
-                    
-                    if self.avgn > 1:
-                        if len(self.avgs) < self.avgn:
-                            self.avgs.append(data_y)
-                        elif len(self.avgs) > self.avgn:
-                            self.avgs = self.avgs[:self.avgn]
-                        else:
-                            self.avgs.append(self.avgs.pop(0))
-                            self.avgs[-1] = data_y
-
-                        data_y = np.average(self.avgs, 0)
-                    
-                    self.volts = data_y[start_index:stop_index]
-                    self.mW = self.volts/self.calSpin.value()
-                    self.dbm = 10*np.log10(np.clip(self.mW, a_min=10**(self.dbclipSpin.value()/10.0), a_max=None))
-                    
-                    self.wls = data_wl[start_index:stop_index]
-                    self.freqs = self.c/self.wls
-
-                    self.UpdateGraph()
-
-                    self.AutoRangeOffs()
-
-                    self.osc_started = False
-                else:
-                    self.statusbar.showMessage(f"Acquisition in progress...")
-        self.busy = False   
-    
-    def measLoop(self):
-        if self.sweeping and self.inited and not self.busy:
-            if self.willstop:
-                self.Stop()
-            else:
-                # t1 = threading.Thread(target=self.threadLoop)
-                # t1.start()
-                self.threadLoop()
-            
     def StopButton(self):
-        if self.sweeping and self.inited:
-            self.willstop = True
+        self.Stop()
     
     def Stop(self):
         if self.sweeping and self.inited:
             self.sweeping = False
-            self.measTimer.stop()
-            self.laser.setSweepState(0, "Stop")
-            self.laser.setState(0, False)
-            self.statusbar.showMessage(f"Sweep stopped")
+            self.engine.Stop()
+            skipped = self.engine.SkippedWrites()
+            sweeps = self.engine.SweepStatus()["sweeps"]
+            self.statusbar.showMessage(f"Sweep stopped after {sweeps} sweeps ({skipped} redundant writes skipped)")
             
     def UpdateGraph(self):
+        ylabel = self.graph_ax.get_ylabel()
         if self.voltRadio.isChecked():
             self.y_results = self.volts
-            self.graph_ax.set_ylabel("Voltage (V)")
+            ylabel = "Voltage (V)"
         elif self.linRadio.isChecked():
             self.y_results = self.mW
-            self.graph_ax.set_ylabel("Power (mW)")
+            ylabel = "Power (mW)"
         elif self.dbRadio.isChecked():
             self.y_results = self.dbm
-            self.graph_ax.set_ylabel("Power (dBm)")
+            ylabel = "Power (dBm)"
 
+        xlabel = self.graph_ax.get_xlabel()
         if self.nmRadio.isChecked():
             self.x_results = self.wls
-            self.graph_ax.set_xlabel("Wavelength (nm)")
+            xlabel = "Wavelength (nm)"
         elif self.thzRadio.isChecked():
             self.x_results = self.freqs
-            self.graph_ax.set_xlabel("Frequency (THz)")
-
-        self.graph_line.set_xdata(self.x_results)
-        self.graph_line.set_ydata(self.y_results)
-        self.graph_ax.autoscale_view(True,True,True)
-        self.graph_ax.relim()
-        self.figure.canvas.draw()
-        self.figure.canvas.flush_events()
+            xlabel = "Frequency (THz)"
+
+        # Full redraws only when labels or limits change, otherwise just the line is blitted
+        self.plot.SetLabels(xlabel, ylabel)
+        self.plot.SetData(self.x_results, self.y_results)
     
     def RescaleX(self, margin=0.0):
         if self.has_data:
@@ -445,11 +391,6 @@ class MainWindow(FormUI, WindowUI):
         if not self.recalc:
             self.recalc = True
             
-            was_sweeping = self.sweeping
-            if was_sweeping:
-                self.measTimer.stop()
-                self.laser.setSweepState(0, "Stop")
-
             sender = self.sender()
             if (sender == self.startSpin):
                 if self.startSpin.value() > self.maxStart: self.startSpin.setValue(self.maxStart)
@@ -472,20 +413,8 @@ class MainWindow(FormUI, WindowUI):
             self.spanfSpin.setValue(self.stopfSpin.value() - self.startfSpin.value())
 
             self.recalc = False
-            if was_sweeping:
-                sw_start = self.startSpin.value()
-                sw_stop = self.stopSpin.value()
-                sw_speed = self.speedSpin.value()
-                sw_time = (sw_stop - sw_start)/sw_speed
-                time_range = 1.1*sw_time
-                time_delay = sw_time/10.0
-                self.laser.setSweep(0, 'CONT', sw_start, sw_stop, 1, 0, 0, sw_speed)
-                self.osc.SetTimeRange(time_range)
-                self.osc.SetTimeDelay(time_delay)
-                self.laser.setSweepState(0, "Start")
-                del self.avgs
-                self.avgs = []
-                self.measTimer.start()
+            if self.sweeping:
+                self.engine.ChangeSweep(self.SweepSettings())
 
             self.statusbar.showMessage(f"Sweep conditions updated")
 
@@ -493,11 +422,6 @@ class MainWindow(FormUI, WindowUI):
         if not self.recalc:
             self.recalc = True
             
-            was_sweeping = self.sweeping
-            if was_sweeping:
-                self.measTimer.stop()
-                self.laser.setSweepState(0, "Stop")
-            
             sender = self.sender()
             if (sender == self.centerSpin):
                 if self.centerSpin.value() > self.maxCenter: self.centerSpin.setValue(self.maxCenter)
@@ -524,20 +448,8 @@ class MainWindow(FormUI, WindowUI):
             self.spanfSpin.setValue(self.stopfSpin.value() - self.startfSpin.value())
 
             self.recalc = False
-            if was_sweeping:
-                sw_start = self.startSpin.value()
-                sw_stop = self.stopSpin.value()
-                sw_speed = self.speedSpin.value()
-                sw_time = (sw_stop - sw_start)/sw_speed
-                time_range = 1.1*sw_time
-                time_delay = sw_time/10.0
-                self.laser.setSweep(0, 'CONT', sw_start, sw_stop, 1, 0, 0, sw_speed)
-                self.osc.SetTimeRange(time_range)
-                self.osc.SetTimeDelay(time_delay)
-                self.laser.setSweepState(0, "Start")
-                del self.avgs
-                self.avgs = []
-                self.measTimer.start()
+            if self.sweeping:
+                self.engine.ChangeSweep(self.SweepSettings())
 
             self.statusbar.showMessage(f"Sweep conditions updated")
 
@@ -560,93 +472,39 @@ class MainWindow(FormUI, WindowUI):
 
     def OnSpeedChanged(self):    
         if self.sweeping:
-            self.measTimer.stop()
-            self.laser.setSweepState(0, "Stop")
-
-            sw_start = self.startSpin.value()
-            sw_stop = self.stopSpin.value()
-            sw_speed = self.speedSpin.value()
-            sw_time = (sw_stop - sw_start)/sw_speed
-            time_range = 1.1*sw_time
-            time_delay = sw_time/10.0
-
-            self.laser.setSweep(0, 'CONT', sw_start, sw_stop, 1, 0, 0, sw_speed)
-            self.osc.SetTimeRange(time_range)
-            self.osc.SetTimeDelay(time_delay)
-            self.laser.setSweepState(0, "Start")
-            del self.avgs
-            self.avgs = []
-            self.measTimer.start()
+            self.engine.ChangeSweep(self.SweepSettings())
 
             self.statusbar.showMessage(f"Sweep conditions updated")
 
     def OnPowerChanged(self):        
-        was_sweeping = self.sweeping
-        if was_sweeping:
-            self.measTimer.stop()
-            self.laser.setSweepState(0, "Stop")
-
         if self.inited:
-            self.laser.setPwr(0, self.powerSpin.value())
-
-        if was_sweeping:
-            self.laser.setSweepState(0, "Start")
-            del self.avgs
-            self.avgs = []
-            self.measTimer.start()
+            self.engine.ChangePower(self.powerSpin.value())
 
         self.statusbar.showMessage(f"Sweep conditions updated")
 
     def OnOscYChanged(self):
-        was_sweeping = self.sweeping
-        if was_sweeping:
-            self.measTimer.stop()
-
         if self.inited:
-            chan = self.oscchanSpin.value()
-            self.osc.SetProbe(1, chan)
-            self.osc.SetCoupling(chan, self.couplingCombo.currentText())
-            self.osc.SetRange(self.rangeSpin.value(), chan)
-            self.osc.SetOffset(self.offsetSpin.value(), chan)
-
-        if was_sweeping:
-                self.measTimer.start()
+            self.engine.ChangeVertical(self.SweepSettings())
 
         self.statusbar.showMessage(f"Vertical scale updated")
 
     def OnTriggerChanged(self):
-        was_sweeping = self.sweeping
-        if was_sweeping:
-            self.measTimer.stop()
-
         if self.inited:
-            self.osc.SetTriggerSource(self.triggerCombo.currentText())
-            self.osc.SetTriggerLevel(self.triglvSpin.value())
-
-        if was_sweeping:
-                self.measTimer.start()
+            self.engine.ChangeTrigger(self.SweepSettings())
 
         self.statusbar.showMessage(f"Trigger updated")
 
     def OnAcquisitionChanged(self):
-        was_sweeping = self.sweeping
-        if was_sweeping:
-            self.measTimer.stop()
-
         if self.inited:
-            self.osc.SetAcqType(self.acqCombo.currentText())
-
-        if was_sweeping:
-            del self.avgs
-            self.avgs = []
-            self.measTimer.start()
+            self.engine.ChangeAcqType(self.acqCombo.currentText())
 
         self.statusbar.showMessage(f"Acquisition type updated")
 
     def OnAvgChanged(self):
-        self.avgn = self.avgSpin.value()
-        del self.avgs
-        self.avgs = []
+        self.engine.ChangeAveraging(self.avgSpin.value(), self.avgmodeCombo.currentText(), self.avgonCombo.currentText())
+
+    def OnProcessingChanged(self):
+        self.engine.ChangeProcessing(self.calSpin.value(), self.dbclipSpin.value())
             
     def OnChangeYScale(self):
         if self.voltRadio.isChecked():
@@ -656,7 +514,7 @@ class MainWindow(FormUI, WindowUI):
         elif self.dbRadio.isChecked():
             self.y_results = self.dbm
         self.RescaleY()
-        self.UpdateGraph()
+        self.RequestRender()
         self.statusbar.showMessage(f"Y Scale changed")
 
     def OnChangeXScale(self):
@@ -667,7 +525,7 @@ class MainWindow(FormUI, WindowUI):
             self.x_results = self.freqs
             self.xscaleStack.setCurrentIndex(1)
         self.RescaleX()        
-        self.UpdateGraph()
+        self.RequestRender()
         self.statusbar.showMessage(f"X Scale changed")
         
     def OnSaveSettings(self):
@@ -692,6 +550,13 @@ class MainWindow(FormUI, WindowUI):
         
         self.statusbar.showMessage(f"Settings loaded")
     
+    def OnCalibrateLatency(self):
+        # Needs a running sweep with a clear peak in it
+        if self.sweeping:
+            self.engine.CalibrateLatency()
+        else:
+            self.statusbar.showMessage(f"Run a sweep with a clear peak to calibrate the trigger latency")
+
     def OnSaveResults(self):
         file = QFileDialog.getSaveFileName(self, "Save results", self.lastdir, "Data files (*.txt *.csv *.dat)")
         filename = file[0]
@@ -791,6 +656,7 @@ class MainWindow(FormUI, WindowUI):
 
     def closeEvent(self, event):
         self.Stop()
+        self.engine.Close()
         self.saveSettings()
 
 #Run
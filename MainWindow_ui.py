@@ -0,0 +1,632 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'MainWindow.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_MainWindow(object):
+    def setupUi(self, MainWindow):
+        MainWindow.setObjectName("MainWindow")
+        MainWindow.resize(1084, 670)
+        icon = QtGui.QIcon()
+        icon.addPixmap(QtGui.QPixmap("../Horiba/H20_VUV/spectrum.ico"), QtGui.QIcon.Normal, QtGui.QIcon.Off)
+        MainWindow.setWindowIcon(icon)
+        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget.setObjectName("centralwidget")
+        self.gridLayout = QtWidgets.QGridLayout(self.centralwidget)
+        self.gridLayout.setObjectName("gridLayout")
+        self.groupBox_2 = QtWidgets.QGroupBox(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.groupBox_2.sizePolicy().hasHeightForWidth())
+        self.groupBox_2.setSizePolicy(sizePolicy)
+        self.groupBox_2.setObjectName("groupBox_2")
+        self.gridLayout_2 = QtWidgets.QGridLayout(self.groupBox_2)
+        self.gridLayout_2.setObjectName("gridLayout_2")
+        self.graphHolder = QtWidgets.QGridLayout()
+        self.graphHolder.setObjectName("graphHolder")
+        self.gridLayout_2.addLayout(self.graphHolder, 0, 0, 1, 1)
+        self.gridLayout.addWidget(self.groupBox_2, 0, 1, 7, 1)
+        self.groupBox_4 = QtWidgets.QGroupBox(self.centralwidget)
+        self.groupBox_4.setObjectName("groupBox_4")
+        self.gridLayout_5 = QtWidgets.QGridLayout(self.groupBox_4)
+        self.gridLayout_5.setObjectName("gridLayout_5")
+        self.frame_2 = QtWidgets.QFrame(self.groupBox_4)
+        self.frame_2.setMinimumSize(QtCore.QSize(0, 0))
+        self.frame_2.setFrameShape(QtWidgets.QFrame.StyledPanel)
+        self.frame_2.setFrameShadow(QtWidgets.QFrame.Raised)
+        self.frame_2.setObjectName("frame_2")
+        self.gridLayout_7 = QtWidgets.QGridLayout(self.frame_2)
+        self.gridLayout_7.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_7.setObjectName("gridLayout_7")
+        self.voltRadio = QtWidgets.QRadioButton(self.frame_2)
+        self.voltRadio.setChecked(True)
+        self.voltRadio.setObjectName("voltRadio")
+        self.gridLayout_7.addWidget(self.voltRadio, 0, 0, 1, 1)
+        self.linRadio = QtWidgets.QRadioButton(self.frame_2)
+        self.linRadio.setChecked(False)
+        self.linRadio.setObjectName("linRadio")
+        self.gridLayout_7.addWidget(self.linRadio, 0, 1, 1, 1)
+        self.dbRadio = QtWidgets.QRadioButton(self.frame_2)
+        self.dbRadio.setObjectName("dbRadio")
+        self.gridLayout_7.addWidget(self.dbRadio, 0, 2, 1, 1)
+        self.gridLayout_5.addWidget(self.frame_2, 1, 0, 1, 2)
+        self.frame = QtWidgets.QFrame(self.groupBox_4)
+        self.frame.setMinimumSize(QtCore.QSize(0, 0))
+        self.frame.setFrameShape(QtWidgets.QFrame.NoFrame)
+        self.frame.setFrameShadow(QtWidgets.QFrame.Plain)
+        self.frame.setLineWidth(0)
+        self.frame.setObjectName("frame")
+        self.gridLayout_6 = QtWidgets.QGridLayout(self.frame)
+        self.gridLayout_6.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_6.setObjectName("gridLayout_6")
+        self.nmRadio = QtWidgets.QRadioButton(self.frame)
+        self.nmRadio.setChecked(True)
+        self.nmRadio.setObjectName("nmRadio")
+        self.gridLayout_6.addWidget(self.nmRadio, 0, 0, 1, 1)
+        self.thzRadio = QtWidgets.QRadioButton(self.frame)
+        self.thzRadio.setObjectName("thzRadio")
+        self.gridLayout_6.addWidget(self.thzRadio, 0, 1, 1, 1)
+        self.label_17 = QtWidgets.QLabel(self.frame)
+        self.label_17.setObjectName("label_17")
+        self.gridLayout_6.addWidget(self.label_17, 0, 2, 1, 1)
+        self.gridLayout_5.addWidget(self.frame, 0, 0, 1, 2)
+        self.verticalLayout_6 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_6.setContentsMargins(-1, 0, -1, -1)
+        self.verticalLayout_6.setSpacing(0)
+        self.verticalLayout_6.setObjectName("verticalLayout_6")
+        self.label_6 = QtWidgets.QLabel(self.groupBox_4)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label_6.sizePolicy().hasHeightForWidth())
+        self.label_6.setSizePolicy(sizePolicy)
+        self.label_6.setMaximumSize(QtCore.QSize(16777215, 16777215))
+        self.label_6.setObjectName("label_6")
+        self.verticalLayout_6.addWidget(self.label_6)
+        self.calSpin = QtWidgets.QDoubleSpinBox(self.groupBox_4)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.calSpin.sizePolicy().hasHeightForWidth())
+        self.calSpin.setSizePolicy(sizePolicy)
+        self.calSpin.setMaximumSize(QtCore.QSize(16777215, 16777215))
+        self.calSpin.setKeyboardTracking(False)
+        self.calSpin.setDecimals(3)
+        self.calSpin.setMaximum(1000.0)
+        self.calSpin.setProperty("value", 1.0)
+        self.calSpin.setObjectName("calSpin")
+        self.verticalLayout_6.addWidget(self.calSpin)
+        self.gridLayout_5.addLayout(self.verticalLayout_6, 2, 0, 1, 1)
+        self.verticalLayout_16 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_16.setSpacing(0)
+        self.verticalLayout_16.setObjectName("verticalLayout_16")
+        self.label_16 = QtWidgets.QLabel(self.groupBox_4)
+        self.label_16.setObjectName("label_16")
+        self.verticalLayout_16.addWidget(self.label_16)
+        self.dbclipSpin = QtWidgets.QDoubleSpinBox(self.groupBox_4)
+        self.dbclipSpin.setKeyboardTracking(False)
+        self.dbclipSpin.setMinimum(-200.0)
+        self.dbclipSpin.setMaximum(0.0)
+        self.dbclipSpin.setProperty("value", -30.0)
+        self.dbclipSpin.setObjectName("dbclipSpin")
+        self.verticalLayout_16.addWidget(self.dbclipSpin)
+        self.gridLayout_5.addLayout(self.verticalLayout_16, 2, 1, 1, 1)
+        self.gridLayout.addWidget(self.groupBox_4, 2, 0, 1, 1)
+        self.groupBox_3 = QtWidgets.QGroupBox(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.groupBox_3.sizePolicy().hasHeightForWidth())
+        self.groupBox_3.setSizePolicy(sizePolicy)
+        self.groupBox_3.setMaximumSize(QtCore.QSize(320, 16777215))
+        self.groupBox_3.setObjectName("groupBox_3")
+        self.gridLayout_3 = QtWidgets.QGridLayout(self.groupBox_3)
+        self.gridLayout_3.setObjectName("gridLayout_3")
+        self.verticalLayout_3 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_3.setSpacing(0)
+        self.verticalLayout_3.setObjectName("verticalLayout_3")
+        self.label_3 = QtWidgets.QLabel(self.groupBox_3)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label_3.sizePolicy().hasHeightForWidth())
+        self.label_3.setSizePolicy(sizePolicy)
+        self.label_3.setObjectName("label_3")
+        self.verticalLayout_3.addWidget(self.label_3)
+        self.speedSpin = QtWidgets.QDoubleSpinBox(self.groupBox_3)
+        self.speedSpin.setKeyboardTracking(False)
+        self.speedSpin.setDecimals(3)
+        self.speedSpin.setMinimum(0.001)
+        self.speedSpin.setMaximum(1000.0)
+        self.speedSpin.setProperty("value", 1.0)
+        self.speedSpin.setObjectName("speedSpin")
+        self.verticalLayout_3.addWidget(self.speedSpin)
+        self.gridLayout_3.addLayout(self.verticalLayout_3, 3, 0, 1, 1)
+        self.verticalLayout_12 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_12.setSpacing(0)
+        self.verticalLayout_12.setObjectName("verticalLayout_12")
+        self.label_12 = QtWidgets.QLabel(self.groupBox_3)
+        self.label_12.setObjectName("label_12")
+        self.verticalLayout_12.addWidget(self.label_12)
+        self.powerSpin = QtWidgets.QDoubleSpinBox(self.groupBox_3)
+        self.powerSpin.setKeyboardTracking(False)
+        self.powerSpin.setObjectName("powerSpin")
+        self.verticalLayout_12.addWidget(self.powerSpin)
+        self.gridLayout_3.addLayout(self.verticalLayout_12, 3, 1, 1, 1)
+        self.xscaleStack = QtWidgets.QStackedWidget(self.groupBox_3)
+        self.xscaleStack.setLineWidth(0)
+        self.xscaleStack.setObjectName("xscaleStack")
+        self.nm = QtWidgets.QWidget()
+        self.nm.setObjectName("nm")
+        self.gridLayout_8 = QtWidgets.QGridLayout(self.nm)
+        self.gridLayout_8.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_8.setObjectName("gridLayout_8")
+        self.verticalLayout = QtWidgets.QVBoxLayout()
+        self.verticalLayout.setSpacing(0)
+        self.verticalLayout.setObjectName("verticalLayout")
+        self.label = QtWidgets.QLabel(self.nm)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label.sizePolicy().hasHeightForWidth())
+        self.label.setSizePolicy(sizePolicy)
+        self.label.setObjectName("label")
+        self.verticalLayout.addWidget(self.label)
+        self.startSpin = QtWidgets.QDoubleSpinBox(self.nm)
+        self.startSpin.setKeyboardTracking(False)
+        self.startSpin.setDecimals(3)
+        self.startSpin.setMinimum(1494.0)
+        self.startSpin.setMaximum(1641.0)
+        self.startSpin.setProperty("value", 1530.0)
+        self.startSpin.setObjectName("startSpin")
+        self.verticalLayout.addWidget(self.startSpin)
+        self.gridLayout_8.addLayout(self.verticalLayout, 0, 0, 1, 1)
+        self.verticalLayout_2 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_2.setSpacing(0)
+        self.verticalLayout_2.setObjectName("verticalLayout_2")
+        self.label_2 = QtWidgets.QLabel(self.nm)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label_2.sizePolicy().hasHeightForWidth())
+        self.label_2.setSizePolicy(sizePolicy)
+        self.label_2.setObjectName("label_2")
+        self.verticalLayout_2.addWidget(self.label_2)
+        self.stopSpin = QtWidgets.QDoubleSpinBox(self.nm)
+        self.stopSpin.setKeyboardTracking(False)
+        self.stopSpin.setDecimals(3)
+        self.stopSpin.setMinimum(1494.0)
+        self.stopSpin.setMaximum(1641.0)
+        self.stopSpin.setProperty("value", 1570.0)
+        self.stopSpin.setObjectName("stopSpin")
+        self.verticalLayout_2.addWidget(self.stopSpin)
+        self.gridLayout_8.addLayout(self.verticalLayout_2, 0, 1, 1, 1)
+        self.verticalLayout_9 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_9.setSpacing(0)
+        self.verticalLayout_9.setObjectName("verticalLayout_9")
+        self.label_9 = QtWidgets.QLabel(self.nm)
+        self.label_9.setObjectName("label_9")
+        self.verticalLayout_9.addWidget(self.label_9)
+        self.spanSpin = QtWidgets.QDoubleSpinBox(self.nm)
+        self.spanSpin.setKeyboardTracking(False)
+        self.spanSpin.setDecimals(3)
+        self.spanSpin.setMinimum(0.001)
+        self.spanSpin.setMaximum(146.0)
+        self.spanSpin.setProperty("value", 40.0)
+        self.spanSpin.setObjectName("spanSpin")
+        self.verticalLayout_9.addWidget(self.spanSpin)
+        self.gridLayout_8.addLayout(self.verticalLayout_9, 1, 0, 1, 1)
+        self.verticalLayout_11 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_11.setContentsMargins(-1, -1, -1, 0)
+        self.verticalLayout_11.setSpacing(0)
+        self.verticalLayout_11.setObjectName("verticalLayout_11")
+        self.label_11 = QtWidgets.QLabel(self.nm)
+        self.label_11.setObjectName("label_11")
+        self.verticalLayout_11.addWidget(self.label_11)
+        self.centerSpin = QtWidgets.QDoubleSpinBox(self.nm)
+        self.centerSpin.setKeyboardTracking(False)
+        self.centerSpin.setDecimals(3)
+        self.centerSpin.setMinimum(1494.0)
+        self.centerSpin.setMaximum(1641.0)
+        self.centerSpin.setProperty("value", 1550.0)
+        self.centerSpin.setObjectName("centerSpin")
+        self.verticalLayout_11.addWidget(self.centerSpin)
+        self.gridLayout_8.addLayout(self.verticalLayout_11, 1, 1, 1, 1)
+        self.xscaleStack.addWidget(self.nm)
+        self.thz = QtWidgets.QWidget()
+        self.thz.setObjectName("thz")
+        self.gridLayout_9 = QtWidgets.QGridLayout(self.thz)
+        self.gridLayout_9.setContentsMargins(0, 0, 0, 0)
+        self.gridLayout_9.setObjectName("gridLayout_9")
+        self.verticalLayout_17 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_17.setSpacing(0)
+        self.verticalLayout_17.setObjectName("verticalLayout_17")
+        self.label_18 = QtWidgets.QLabel(self.thz)
+        self.label_18.setObjectName("label_18")
+        self.verticalLayout_17.addWidget(self.label_18)
+        self.startfSpin = QtWidgets.QDoubleSpinBox(self.thz)
+        self.startfSpin.setKeyboardTracking(False)
+        self.startfSpin.setDecimals(4)
+        self.startfSpin.setMinimum(177.2871)
+        self.startfSpin.setMaximum(200.6642)
+        self.startfSpin.setProperty("value", 190.9506)
+        self.startfSpin.setObjectName("startfSpin")
+        self.verticalLayout_17.addWidget(self.startfSpin)
+        self.gridLayout_9.addLayout(self.verticalLayout_17, 0, 0, 1, 1)
+        self.verticalLayout_18 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_18.setSpacing(0)
+        self.verticalLayout_18.setObjectName("verticalLayout_18")
+        self.label_19 = QtWidgets.QLabel(self.thz)
+        self.label_19.setObjectName("label_19")
+        self.verticalLayout_18.addWidget(self.label_19)
+        self.stopfSpin = QtWidgets.QDoubleSpinBox(self.thz)
+        self.stopfSpin.setKeyboardTracking(False)
+        self.stopfSpin.setDecimals(4)
+        self.stopfSpin.setMinimum(177.2871)
+        self.stopfSpin.setMaximum(200.6642)
+        self.stopfSpin.setProperty("value", 195.9428)
+        self.stopfSpin.setObjectName("stopfSpin")
+        self.verticalLayout_18.addWidget(self.stopfSpin)
+        self.gridLayout_9.addLayout(self.verticalLayout_18, 0, 1, 1, 1)
+        self.verticalLayout_19 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_19.setSpacing(0)
+        self.verticalLayout_19.setObjectName("verticalLayout_19")
+        self.label_20 = QtWidgets.QLabel(self.thz)
+        self.label_20.setObjectName("label_20")
+        self.verticalLayout_19.addWidget(self.label_20)
+        self.spanfSpin = QtWidgets.QDoubleSpinBox(self.thz)
+        self.spanfSpin.setKeyboardTracking(False)
+        self.spanfSpin.setDecimals(4)
+        self.spanfSpin.setMinimum(0.0001)
+        self.spanfSpin.setMaximum(23.3771)
+        self.spanfSpin.setProperty("value", 4.9922)
+        self.spanfSpin.setObjectName("spanfSpin")
+        self.verticalLayout_19.addWidget(self.spanfSpin)
+        self.gridLayout_9.addLayout(self.verticalLayout_19, 1, 0, 1, 1)
+        self.verticalLayout_20 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_20.setSpacing(0)
+        self.verticalLayout_20.setObjectName("verticalLayout_20")
+        self.label_21 = QtWidgets.QLabel(self.thz)
+        self.label_21.setObjectName("label_21")
+        self.verticalLayout_20.addWidget(self.label_21)
+        self.centerfSpin = QtWidgets.QDoubleSpinBox(self.thz)
+        self.centerfSpin.setKeyboardTracking(False)
+        self.centerfSpin.setDecimals(4)
+        self.centerfSpin.setMinimum(177.2871)
+        self.centerfSpin.setMaximum(200.6642)
+        self.centerfSpin.setProperty("value", 193.4145)
+        self.centerfSpin.setObjectName("centerfSpin")
+        self.verticalLayout_20.addWidget(self.centerfSpin)
+        self.gridLayout_9.addLayout(self.verticalLayout_20, 1, 1, 1, 1)
+        self.xscaleStack.addWidget(self.thz)
+        self.gridLayout_3.addWidget(self.xscaleStack, 0, 0, 1, 2)
+        self.gridLayout.addWidget(self.groupBox_3, 0, 0, 1, 1)
+        self.groupBox = QtWidgets.QGroupBox(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.groupBox.sizePolicy().hasHeightForWidth())
+        self.groupBox.setSizePolicy(sizePolicy)
+        self.groupBox.setMaximumSize(QtCore.QSize(320, 16777215))
+        self.groupBox.setObjectName("groupBox")
+        self.gridLayout_4 = QtWidgets.QGridLayout(self.groupBox)
+        self.gridLayout_4.setObjectName("gridLayout_4")
+        self.verticalLayout_5 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_5.setSpacing(0)
+        self.verticalLayout_5.setObjectName("verticalLayout_5")
+        self.label_10 = QtWidgets.QLabel(self.groupBox)
+        self.label_10.setObjectName("label_10")
+        self.verticalLayout_5.addWidget(self.label_10)
+        self.offsetSpin = QtWidgets.QDoubleSpinBox(self.groupBox)
+        self.offsetSpin.setKeyboardTracking(False)
+        self.offsetSpin.setDecimals(4)
+        self.offsetSpin.setMinimum(-100.0)
+        self.offsetSpin.setMaximum(100.0)
+        self.offsetSpin.setObjectName("offsetSpin")
+        self.verticalLayout_5.addWidget(self.offsetSpin)
+        self.gridLayout_4.addLayout(self.verticalLayout_5, 1, 1, 1, 1)
+        self.verticalLayout_7 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_7.setContentsMargins(-1, 0, -1, -1)
+        self.verticalLayout_7.setSpacing(0)
+        self.verticalLayout_7.setObjectName("verticalLayout_7")
+        self.label_7 = QtWidgets.QLabel(self.groupBox)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Preferred)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label_7.sizePolicy().hasHeightForWidth())
+        self.label_7.setSizePolicy(sizePolicy)
+        self.label_7.setObjectName("label_7")
+        self.verticalLayout_7.addWidget(self.label_7)
+        self.oscchanSpin = QtWidgets.QSpinBox(self.groupBox)
+        self.oscchanSpin.setKeyboardTracking(False)
+        self.oscchanSpin.setMinimum(1)
+        self.oscchanSpin.setMaximum(4)
+        self.oscchanSpin.setObjectName("oscchanSpin")
+        self.verticalLayout_7.addWidget(self.oscchanSpin)
+        self.gridLayout_4.addLayout(self.verticalLayout_7, 0, 0, 1, 1)
+        self.verticalLayout_15 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_15.setSpacing(0)
+        self.verticalLayout_15.setObjectName("verticalLayout_15")
+        self.label_15 = QtWidgets.QLabel(self.groupBox)
+        self.label_15.setObjectName("label_15")
+        self.verticalLayout_15.addWidget(self.label_15)
+        self.avgSpin = QtWidgets.QSpinBox(self.groupBox)
+        self.avgSpin.setKeyboardTracking(False)
+        self.avgSpin.setMinimum(1)
+        self.avgSpin.setMaximum(1024)
+        self.avgSpin.setProperty("value", 1)
+        self.avgSpin.setObjectName("avgSpin")
+        self.verticalLayout_15.addWidget(self.avgSpin)
+        self.gridLayout_4.addLayout(self.verticalLayout_15, 5, 1, 1, 1)
+        self.verticalLayout_21 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_21.setSpacing(0)
+        self.verticalLayout_21.setObjectName("verticalLayout_21")
+        self.label_22 = QtWidgets.QLabel(self.groupBox)
+        self.label_22.setObjectName("label_22")
+        self.verticalLayout_21.addWidget(self.label_22)
+        self.avgmodeCombo = QtWidgets.QComboBox(self.groupBox)
+        self.avgmodeCombo.setObjectName("avgmodeCombo")
+        self.avgmodeCombo.addItem("")
+        self.avgmodeCombo.addItem("")
+        self.avgmodeCombo.addItem("")
+        self.verticalLayout_21.addWidget(self.avgmodeCombo)
+        self.gridLayout_4.addLayout(self.verticalLayout_21, 6, 1, 1, 1)
+        self.verticalLayout_23 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_23.setSpacing(0)
+        self.verticalLayout_23.setObjectName("verticalLayout_23")
+        self.label_24 = QtWidgets.QLabel(self.groupBox)
+        self.label_24.setObjectName("label_24")
+        self.verticalLayout_23.addWidget(self.label_24)
+        self.stepSpin = QtWidgets.QDoubleSpinBox(self.groupBox)
+        self.stepSpin.setKeyboardTracking(False)
+        self.stepSpin.setDecimals(2)
+        self.stepSpin.setMaximum(1000.0)
+        self.stepSpin.setSingleStep(0.1)
+        self.stepSpin.setProperty("value", 0.0)
+        self.stepSpin.setObjectName("stepSpin")
+        self.verticalLayout_23.addWidget(self.stepSpin)
+        self.gridLayout_4.addLayout(self.verticalLayout_23, 8, 0, 1, 1)
+        self.verticalLayout_24 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_24.setSpacing(0)
+        self.verticalLayout_24.setObjectName("verticalLayout_24")
+        self.label_25 = QtWidgets.QLabel(self.groupBox)
+        self.label_25.setObjectName("label_25")
+        self.verticalLayout_24.addWidget(self.label_25)
+        self.dwellSpin = QtWidgets.QDoubleSpinBox(self.groupBox)
+        self.dwellSpin.setKeyboardTracking(False)
+        self.dwellSpin.setDecimals(0)
+        self.dwellSpin.setMaximum(10000.0)
+        self.dwellSpin.setSingleStep(10.0)
+        self.dwellSpin.setProperty("value", 50.0)
+        self.dwellSpin.setObjectName("dwellSpin")
+        self.verticalLayout_24.addWidget(self.dwellSpin)
+        self.gridLayout_4.addLayout(self.verticalLayout_24, 8, 1, 1, 1)
+        self.llogCheck = QtWidgets.QCheckBox(self.groupBox)
+        self.llogCheck.setObjectName("llogCheck")
+        self.gridLayout_4.addWidget(self.llogCheck, 7, 0, 1, 2)
+        self.verticalLayout_22 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_22.setSpacing(0)
+        self.verticalLayout_22.setObjectName("verticalLayout_22")
+        self.label_23 = QtWidgets.QLabel(self.groupBox)
+        self.label_23.setObjectName("label_23")
+        self.verticalLayout_22.addWidget(self.label_23)
+        self.avgonCombo = QtWidgets.QComboBox(self.groupBox)
+        self.avgonCombo.setObjectName("avgonCombo")
+        self.avgonCombo.addItem("")
+        self.avgonCombo.addItem("")
+        self.avgonCombo.addItem("")
+        self.avgonCombo.addItem("")
+        self.verticalLayout_22.addWidget(self.avgonCombo)
+        self.gridLayout_4.addLayout(self.verticalLayout_22, 6, 0, 1, 1)
+        self.verticalLayout_8 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_8.setContentsMargins(-1, 0, -1, -1)
+        self.verticalLayout_8.setSpacing(0)
+        self.verticalLayout_8.setObjectName("verticalLayout_8")
+        self.label_8 = QtWidgets.QLabel(self.groupBox)
+        self.label_8.setObjectName("label_8")
+        self.verticalLayout_8.addWidget(self.label_8)
+        self.triggerCombo = QtWidgets.QComboBox(self.groupBox)
+        self.triggerCombo.setObjectName("triggerCombo")
+        self.triggerCombo.addItem("")
+        self.triggerCombo.addItem("")
+        self.triggerCombo.addItem("")
+        self.triggerCombo.addItem("")
+        self.triggerCombo.addItem("")
+        self.verticalLayout_8.addWidget(self.triggerCombo)
+        self.gridLayout_4.addLayout(self.verticalLayout_8, 3, 0, 1, 1)
+        self.verticalLayout_4 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_4.setSpacing(0)
+        self.verticalLayout_4.setObjectName("verticalLayout_4")
+        self.label_4 = QtWidgets.QLabel(self.groupBox)
+        self.label_4.setObjectName("label_4")
+        self.verticalLayout_4.addWidget(self.label_4)
+        self.triglvSpin = QtWidgets.QDoubleSpinBox(self.groupBox)
+        self.triglvSpin.setKeyboardTracking(False)
+        self.triglvSpin.setMinimum(-50.0)
+        self.triglvSpin.setMaximum(50.0)
+        self.triglvSpin.setProperty("value", 1.0)
+        self.triglvSpin.setObjectName("triglvSpin")
+        self.verticalLayout_4.addWidget(self.triglvSpin)
+        self.gridLayout_4.addLayout(self.verticalLayout_4, 3, 1, 1, 1)
+        self.verticalLayout_14 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_14.setSpacing(0)
+        self.verticalLayout_14.setObjectName("verticalLayout_14")
+        self.label_14 = QtWidgets.QLabel(self.groupBox)
+        self.label_14.setObjectName("label_14")
+        self.verticalLayout_14.addWidget(self.label_14)
+        self.couplingCombo = QtWidgets.QComboBox(self.groupBox)
+        self.couplingCombo.setObjectName("couplingCombo")
+        self.couplingCombo.addItem("")
+        self.couplingCombo.addItem("")
+        self.verticalLayout_14.addWidget(self.couplingCombo)
+        self.gridLayout_4.addLayout(self.verticalLayout_14, 0, 1, 1, 1)
+        self.verticalLayout_13 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_13.setContentsMargins(-1, -1, -1, 0)
+        self.verticalLayout_13.setSpacing(0)
+        self.verticalLayout_13.setObjectName("verticalLayout_13")
+        self.label_13 = QtWidgets.QLabel(self.groupBox)
+        self.label_13.setObjectName("label_13")
+        self.verticalLayout_13.addWidget(self.label_13)
+        self.acqCombo = QtWidgets.QComboBox(self.groupBox)
+        self.acqCombo.setObjectName("acqCombo")
+        self.acqCombo.addItem("")
+        self.acqCombo.addItem("")
+        self.acqCombo.addItem("")
+        self.verticalLayout_13.addWidget(self.acqCombo)
+        self.gridLayout_4.addLayout(self.verticalLayout_13, 5, 0, 1, 1)
+        self.verticalLayout_10 = QtWidgets.QVBoxLayout()
+        self.verticalLayout_10.setSpacing(0)
+        self.verticalLayout_10.setObjectName("verticalLayout_10")
+        self.label_5 = QtWidgets.QLabel(self.groupBox)
+        self.label_5.setObjectName("label_5")
+        self.verticalLayout_10.addWidget(self.label_5)
+        self.rangeSpin = QtWidgets.QDoubleSpinBox(self.groupBox)
+        self.rangeSpin.setKeyboardTracking(False)
+        self.rangeSpin.setDecimals(3)
+        self.rangeSpin.setMaximum(100.0)
+        self.rangeSpin.setObjectName("rangeSpin")
+        self.verticalLayout_10.addWidget(self.rangeSpin)
+        self.gridLayout_4.addLayout(self.verticalLayout_10, 1, 0, 1, 1)
+        self.autorangeCheck = QtWidgets.QCheckBox(self.groupBox)
+        self.autorangeCheck.setObjectName("autorangeCheck")
+        self.gridLayout_4.addWidget(self.autorangeCheck, 2, 0, 1, 2)
+        self.gridLayout.addWidget(self.groupBox, 1, 0, 1, 1)
+        self.horizontalLayout = QtWidgets.QHBoxLayout()
+        self.horizontalLayout.setContentsMargins(-1, 0, -1, -1)
+        self.horizontalLayout.setObjectName("horizontalLayout")
+        self.runBut = QtWidgets.QPushButton(self.centralwidget)
+        self.runBut.setObjectName("runBut")
+        self.horizontalLayout.addWidget(self.runBut)
+        self.stopBut = QtWidgets.QPushButton(self.centralwidget)
+        self.stopBut.setObjectName("stopBut")
+        self.horizontalLayout.addWidget(self.stopBut)
+        self.gridLayout.addLayout(self.horizontalLayout, 3, 0, 1, 1)
+        self.saveBut = QtWidgets.QPushButton(self.centralwidget)
+        self.saveBut.setObjectName("saveBut")
+        self.gridLayout.addWidget(self.saveBut, 4, 0, 1, 1)
+        spacerItem = QtWidgets.QSpacerItem(20, 99, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding)
+        self.gridLayout.addItem(spacerItem, 6, 0, 1, 1)
+        MainWindow.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(MainWindow)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 1084, 21))
+        self.menubar.setObjectName("menubar")
+        self.menuFile = QtWidgets.QMenu(self.menubar)
+        self.menuFile.setObjectName("menuFile")
+        self.menuAbout = QtWidgets.QMenu(self.menubar)
+        self.menuAbout.setObjectName("menuAbout")
+        MainWindow.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar.setObjectName("statusbar")
+        MainWindow.setStatusBar(self.statusbar)
+        self.actionSave_config = QtWidgets.QAction(MainWindow)
+        self.actionSave_config.setObjectName("actionSave_config")
+        self.actionLoad_config = QtWidgets.QAction(MainWindow)
+        self.actionLoad_config.setObjectName("actionLoad_config")
+        self.actionSave_final_results = QtWidgets.QAction(MainWindow)
+        self.actionSave_final_results.setObjectName("actionSave_final_results")
+        self.actionSave_raw_data = QtWidgets.QAction(MainWindow)
+        self.actionSave_raw_data.setObjectName("actionSave_raw_data")
+        self.actionCalibrate_latency = QtWidgets.QAction(MainWindow)
+        self.actionCalibrate_latency.setObjectName("actionCalibrate_latency")
+        self.actionExit = QtWidgets.QAction(MainWindow)
+        self.actionExit.setObjectName("actionExit")
+        self.actionAbout = QtWidgets.QAction(MainWindow)
+        self.actionAbout.setObjectName("actionAbout")
+        self.menuFile.addAction(self.actionSave_config)
+        self.menuFile.addAction(self.actionLoad_config)
+        self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionSave_final_results)
+        self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionCalibrate_latency)
+        self.menuFile.addSeparator()
+        self.menuFile.addAction(self.actionExit)
+        self.menuAbout.addAction(self.actionAbout)
+        self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuAbout.menuAction())
+
+        self.retranslateUi(MainWindow)
+        self.xscaleStack.setCurrentIndex(1)
+        self.triggerCombo.setCurrentIndex(0)
+        QtCore.QMetaObject.connectSlotsByName(MainWindow)
+
+    def retranslateUi(self, MainWindow):
+        _translate = QtCore.QCoreApplication.translate
+        MainWindow.setWindowTitle(_translate("MainWindow", "LCO HM-BOSA"))
+        self.groupBox_2.setTitle(_translate("MainWindow", "Results"))
+        self.groupBox_4.setTitle(_translate("MainWindow", "Scale config"))
+        self.voltRadio.setText(_translate("MainWindow", "V"))
+        self.linRadio.setText(_translate("MainWindow", "mW"))
+        self.dbRadio.setText(_translate("MainWindow", "dBm"))
+        self.nmRadio.setText(_translate("MainWindow", "nm"))
+        self.thzRadio.setText(_translate("MainWindow", "THz"))
+        self.label_17.setText(_translate("MainWindow", "    "))
+        self.label_6.setText(_translate("MainWindow", "Calib. (V/mW)"))
+        self.label_16.setText(_translate("MainWindow", "Clip (dB)"))
+        self.groupBox_3.setTitle(_translate("MainWindow", "Sweep config"))
+        self.label_3.setText(_translate("MainWindow", "Speed (nm/s)"))
+        self.label_12.setText(_translate("MainWindow", "Power (dBm)"))
+        self.label.setText(_translate("MainWindow", "Start (nm)"))
+        self.label_2.setText(_translate("MainWindow", "Stop (nm)"))
+        self.label_9.setText(_translate("MainWindow", "Span (nm)"))
+        self.label_11.setText(_translate("MainWindow", "Center (nm)"))
+        self.label_18.setText(_translate("MainWindow", "Start (THz)"))
+        self.label_19.setText(_translate("MainWindow", "Stop (THz)"))
+        self.label_20.setText(_translate("MainWindow", "Span (THz)"))
+        self.label_21.setText(_translate("MainWindow", "Center (THz)"))
+        self.groupBox.setTitle(_translate("MainWindow", "Acquisition config"))
+        self.label_10.setText(_translate("MainWindow", "Offset (V)"))
+        self.label_7.setText(_translate("MainWindow", "Osc. Channel"))
+        self.label_15.setText(_translate("MainWindow", "Averages"))
+        self.label_22.setText(_translate("MainWindow", "Avg. Mode"))
+        self.avgmodeCombo.setItemText(0, _translate("MainWindow", "Boxcar"))
+        self.avgmodeCombo.setItemText(1, _translate("MainWindow", "Exponential"))
+        self.avgmodeCombo.setItemText(2, _translate("MainWindow", "Cumulative"))
+        self.label_24.setText(_translate("MainWindow", "Step (pm)"))
+        self.stepSpin.setToolTip(_translate("MainWindow", "Stepped sweep with this step, 0 for a continuous sweep"))
+        self.label_25.setText(_translate("MainWindow", "Dwell (ms)"))
+        self.dwellSpin.setToolTip(_translate("MainWindow", "Time the laser stays at each step of a stepped sweep"))
+        self.llogCheck.setToolTip(_translate("MainWindow", "Take the wavelength axis from the laser\'s lambda logging instead of assuming a linear sweep"))
+        self.llogCheck.setText(_translate("MainWindow", "Lambda Logging"))
+        self.label_23.setText(_translate("MainWindow", "Avg. On"))
+        self.avgonCombo.setToolTip(_translate("MainWindow", "Host: download and average every sweep. Burst: capture the sweeps into segmented memory and download them together. Scope: let the scope average them. Auto: scope or host, whichever costs less"))
+        self.avgonCombo.setItemText(0, _translate("MainWindow", "Host"))
+        self.avgonCombo.setItemText(1, _translate("MainWindow", "Burst"))
+        self.avgonCombo.setItemText(2, _translate("MainWindow", "Scope"))
+        self.avgonCombo.setItemText(3, _translate("MainWindow", "Auto"))
+        self.label_8.setText(_translate("MainWindow", "Trigger source"))
+        self.triggerCombo.setItemText(0, _translate("MainWindow", "EXT"))
+        self.triggerCombo.setItemText(1, _translate("MainWindow", "CHAN1"))
+        self.triggerCombo.setItemText(2, _translate("MainWindow", "CHAN2"))
+        self.triggerCombo.setItemText(3, _translate("MainWindow", "CHAN3"))
+        self.triggerCombo.setItemText(4, _translate("MainWindow", "CHAN4"))
+        self.label_4.setText(_translate("MainWindow", "Trigger level (V)"))
+        self.label_14.setText(_translate("MainWindow", "Coupling"))
+        self.couplingCombo.setItemText(0, _translate("MainWindow", "AC"))
+        self.couplingCombo.setItemText(1, _translate("MainWindow", "DC"))
+        self.label_13.setText(_translate("MainWindow", "Acq. Type"))
+        self.acqCombo.setItemText(0, _translate("MainWindow", "NORM"))
+        self.acqCombo.setItemText(1, _translate("MainWindow", "HRES"))
+        self.acqCombo.setItemText(2, _translate("MainWindow", "PEAK"))
+        self.label_5.setText(_translate("MainWindow", "Range (V)"))
+        self.autorangeCheck.setText(_translate("MainWindow", "Auto Range/Offset"))
+        self.runBut.setText(_translate("MainWindow", "Run"))
+        self.stopBut.setText(_translate("MainWindow", "Stop"))
+        self.saveBut.setText(_translate("MainWindow", "Save current data"))
+        self.menuFile.setTitle(_translate("MainWindow", "File"))
+        self.menuAbout.setTitle(_translate("MainWindow", "About"))
+        self.actionSave_config.setText(_translate("MainWindow", "Save config..."))
+        self.actionLoad_config.setText(_translate("MainWindow", "Load config..."))
+        self.actionSave_final_results.setText(_translate("MainWindow", "Save results..."))
+        self.actionSave_raw_data.setText(_translate("MainWindow", "Save raw data..."))
+        self.actionCalibrate_latency.setText(_translate("MainWindow", "Calibrate trigger latency"))
+        self.actionExit.setText(_translate("MainWindow", "Exit"))
+        self.actionAbout.setText(_translate("MainWindow", "About..."))
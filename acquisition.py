@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+
+"""
+Created on Sun Oct 18 10:02 2026
+
+@author: pfjarschel
+"""
+
+import time
+import queue
+import threading
+import numpy as np
+from typing import NamedTuple
+
+from averaging import Averager
+
+
+def wavelength_axis(data_t, start, speed, table=None):
+    """
+    Wavelength of each sample time (s, from the sweep start). Linear in time at speed,
+    or interpolated in a logged (times, wavelengths) table, which is extended at
+    speed past its ends.
+    """
+    if table is None:
+        return start + data_t*speed
+    t_log, wl_log = table
+    wls = np.interp(data_t, t_log, wl_log)
+    before = data_t < t_log[0]
+    wls[before] = wl_log[0] + (data_t[before] - t_log[0])*speed
+    after = data_t > t_log[-1]
+    wls[after] = wl_log[-1] + (data_t[after] - t_log[-1])*speed
+    return wls
+
+
+class Record(NamedTuple):
+    # One downloaded sweep (or a burst of them, one per row), as raw scope codes, and the settings it was taken with
+    data_t: np.ndarray
+    codes: np.ndarray
+    preamble: object
+    start_wl: float
+    stop_wl: float
+    speed: float
+    wl_table: object
+    t_offset: float
+    generation: int
+    first_step: int = -1
+    steps: int = 0
+    step_wl: float = 0.0
+
+
+class Spectrum():
+    """
+    A reduced sweep, kept as mean scope codes. Volts, mW and dBm are computed
+    the first time they are asked for (when the frame is drawn or saved).
+    With no preamble, codes are taken as volts.
+    """
+    def __init__(self, wls, freqs, codes, preamble=None, cal=1.0, dbclip=-100.0, has_data=True):
+        self.wls = wls
+        self.freqs = freqs
+        self.codes = codes
+        self.preamble = preamble
+        self.cal = cal
+        self.dbclip = dbclip
+        self.has_data = has_data
+        self._volts = None
+        self._mW = None
+        self._dbm = None
+
+    @property
+    def volts(self):
+        if self._volts is None:
+            if self.preamble is None:
+                self._volts = self.codes
+            else:
+                self._volts = (self.codes - self.preamble.yref)*self.preamble.yinc + self.preamble.yorigin
+        return self._volts
+
+    @property
+    def mW(self):
+        if self._mW is None:
+            self._mW = self.volts/self.cal
+        return self._mW
+
+    @property
+    def dbm(self):
+        if self._dbm is None:
+            self._dbm = 10*np.log10(np.clip(self.mW, a_min=10**(self.dbclip/10.0), a_max=None))
+        return self._dbm
+
+
+class AcquisitionWorker(threading.Thread):
+    """
+    Runs the acquisition as a pipeline, so the GUI never blocks on the instruments and
+    the sweep rate is set by the laser, not by host processing:
+        acquire/transfer (this thread) -> records -> reduce (reducer thread) -> spectra -> render
+    The scope is re-armed as soon as a record is read out, and averaging, conversion and
+    plotting of that record happen while the next one is captured. Both queues are bounded:
+    a slow reducer holds back the acquisition, while a slow renderer only skips frames.
+
+    With steps > 0 it runs a stepped sweep instead: the laser stops at steps wavelengths,
+    step_wl apart, triggering the scope at each, and the scope records a short segment per
+    step. The steps are taken in batches, each one a single laser sweep over just its steps,
+    so the laser stops by itself at the end of the batch and the scope's segments always
+    match it. Every batch is downloaded in one transfer, each segment is reduced to its
+    mean, and a spectrum comes out when all steps are in.
+
+    While the worker runs it owns the oscilloscope and the laser: other threads change their
+    settings by posting calls with Submit(), which run between (or instead of) captures, in order.
+    on_spectrum() is called from the reducer thread when a new spectrum can be taken with
+    TakeSpectrum(), and on_status(msg) reports progress from the acquisition thread.
+    """
+    c = 2.99792458e5
+
+    def __init__(self, osc, laser, on_spectrum, on_status=None, depth=2):
+        threading.Thread.__init__(self, daemon=True)
+        self.osc = osc
+        self.laser = laser
+        self.on_spectrum = on_spectrum
+        self.on_status = on_status
+        self.calls = queue.Queue()
+        self.records = queue.Queue(maxsize=depth)
+        self.spectra = queue.Queue(maxsize=1)
+        self.spectra_lock = threading.Lock()
+        self.free_buffers = queue.Queue(maxsize=depth + 1)
+        self.reducer = threading.Thread(target=self.ReduceLoop, daemon=True)
+        self.acquiring = False
+        self.stopping = False
+        self.generation = 0
+        self.sweeps = 0
+        self.t0 = 0.0
+        self.wakes = 0
+        self.armed_wakes = 0
+
+        # Sweep and processing parameters, only changed from the worker thread
+        self.chan = 1
+        self.start_wl = 1550.0
+        self.stop_wl = 1551.0
+        self.speed = 1.0
+        self.wl_table = None
+        self.t_offset = 0.0
+        self.acq_time = 1.0
+        self.segments = 0
+        self.scope_avgn = 0
+        self.transfer_time = 0.0
+        self.steps = 0
+        self.step_wl = 0.0
+        self.step_batch = 100
+        self.acq_timeout = 5.0
+        self.min_poll = 0.02
+        self.max_poll = 0.2
+        self.avgn = 1
+        self.avg_mode = "Boxcar"
+        self.cal = 1.0
+        self.dbclip = -100.0
+
+        # Reducer state
+        self.averager = Averager()
+        self.avg_generation = 0
+        self.avg_scale = None
+        self.wl_axis = None
+        self.wl_axis_key = None
+
+        # Stepped sweep state: first step of the next batch (acquisition thread), and the step means so far (reducer)
+        self.step_index = 0
+        self.step_values = np.zeros(0)
+
+    def Submit(self, function, *args, **kwargs):
+        # Run function(*args, **kwargs) on the worker thread, restarting the capture in progress
+        self._post((function, args, kwargs, True))
+
+    def Configure(self, **kwargs):
+        # Set worker parameters (chan, start_wl, avgn, ...) from any thread
+        self._post((self._configure, (), kwargs, False))
+
+    def ResetAverages(self):
+        self._post((self._reset_averages, (), {}, False))
+
+    def StartAcquisition(self):
+        self.Submit(setattr, self, "acquiring", True)
+
+    def StopAcquisition(self):
+        self.Submit(setattr, self, "acquiring", False)
+
+    def Quit(self, timeout=None):
+        # Every call posted before this one still runs, then the worker ends
+        self._post(None)
+        if self.is_alive():
+            self.join(timeout)
+
+    def TakeSpectrum(self):
+        # Latest reduced spectrum, or None if it was already taken
+        with self.spectra_lock:
+            try:
+                return self.spectra.get_nowait()
+            except queue.Empty:
+                return None
+
+    def _post(self, item):
+        # Queue a call, waking the worker if it is blocked on the scope's service request.
+        # wakes is counted after the wake, so WaitRecord can tell a woken wait from a completed capture
+        self.calls.put(item)
+        if self.osc.srq_events:
+            self.osc.WakeSRQ()
+        self.wakes += 1
+
+    def _configure(self, **kwargs):
+        for key in kwargs:
+            setattr(self, key, kwargs[key])
+        if "avgn" in kwargs or "avg_mode" in kwargs:
+            self._reset_averages()
+
+    def _reset_averages(self):
+        # Records from older generations are not averaged with newer ones
+        self.generation += 1
+
+    def _status(self, msg):
+        if self.on_status is not None:
+            self.on_status(msg)
+
+    def ServiceCalls(self, timeout=0.0):
+        """
+        Runs the posted calls, waiting up to timeout seconds for the first one.
+        Returns True if any of them may have changed the instruments.
+        """
+        invalidated = False
+        try:
+            item = self.calls.get(timeout=timeout) if timeout > 0 else self.calls.get_nowait()
+            while True:
+                if item is None:
+                    # Posted by Quit, after everything that has to run before the worker ends
+                    self.stopping = True
+                    return True
+                function, args, kwargs, invalidates = item
+                try:
+                    function(*args, **kwargs)
+                except Exception as e:
+                    print(f"Error running {getattr(function, '__name__', function)} on the acquisition thread: {e}")
+                invalidated = invalidated or invalidates
+                item = self.calls.get_nowait()
+        except queue.Empty:
+            pass
+        return invalidated
+
+    def StepBatch(self):
+        # Steps in the batch starting at step_index. Batches are evened out, so none is a single step
+        batches = int(np.ceil(self.steps/max(2, self.step_batch)))
+        sizes = [len(b) for b in np.array_split(np.arange(self.steps), batches)]
+        return sizes[np.searchsorted(np.cumsum(sizes), self.step_index, side="right")]
+
+    def CaptureTime(self):
+        # Segmented and scope-averaged captures take one sweep per segment or average
+        return self.acq_time*max(1, self.segments, self.scope_avgn)
+
+    def PollInterval(self):
+        # Time between completion checks: a tenth of the capture time, bounded
+        return max(self.min_poll, min(self.max_poll, self.CaptureTime()/10.0))
+
+    def run(self):
+        self.reducer.start()
+        armed = False
+        while not self.stopping:
+            if not self.acquiring:
+                self.ServiceCalls(0.1)
+                armed = False
+            elif self.ServiceCalls():
+                armed = False
+            else:
+                if not armed:
+                    self.Arm()
+                record = self.WaitRecord()
+                if record is None:
+                    armed = False
+                    if self.steps > 0 and not self.stopping:
+                        self.RestartSteps()
+                    continue
+                # Capture the next sweep while this one goes down the pipeline
+                self.Arm()
+                armed = True
+                self.records.put(record)
+        self.records.put(None)
+        self.reducer.join()
+
+    def Arm(self):
+        if self.steps > 0:
+            self.segments = self.StepBatch()
+            self.osc.SetSegments(self.segments)
+            self.SetupStepBatch()
+        self.osc.PrepareWait()
+        self.osc.Digitize()
+        # Wakes before this point are cleared along with the old service request
+        self.armed_wakes = self.wakes
+        self.osc.NotifyWhenDone()
+        if self.steps > 0:
+            # The laser only starts the batch once the scope waits for its triggers
+            self.laser.setSweepState(0, "Start")
+        self.t0 = time.time()
+        self._status("Starting acquisition...")
+
+    def RestartSteps(self):
+        # Drops a stepped sweep in progress, the next one starts from the first step
+        self.laser.setSweepState(0, "Stop")
+        self.laser.waitSweepState(0, "Stop")
+        self.step_index = 0
+
+    def SetupStepBatch(self):
+        """
+        Makes the laser's stepped sweep cover only the batch starting at step_index, for one
+        cycle, so it stops by itself after the batch's last step, whatever the dwell time.
+        """
+        if self.laser.getSweepState(0) != "Stop":
+            self.laser.setSweepState(0, "Stop")
+            self.laser.waitSweepState(0, "Stop")
+        first = self.step_index
+        last = first + self.segments - 1
+        self.laser.updateSweep(0, start=self.StepWL(first), stop=self.StepWL(last), cycles=1)
+
+    def StepWL(self, i):
+        # Wavelength (nm) of step i, rounded far below the laser's resolution so batches tile exactly
+        return round(self.start_wl + i*self.step_wl, 6)
+
+    def WaitRecord(self):
+        # Waits for the armed capture and reads it out. Returns None if it has to be re-armed
+        capture_time = self.CaptureTime()
+        deadline = self.t0 + self.acq_timeout + 10*capture_time
+        wait = max(0.0, self.t0 + capture_time - time.time())
+        while True:
+            if self.osc.srq_events:
+                # Read out as soon as the scope requests service. Posted calls wake the wait too,
+                # so after a wake the status byte tells whether the capture is really over
+                # Local VISA event waits can't be woken, so they are cut into poll intervals
+                wait = deadline - time.time()
+                if not self.osc.remote:
+                    wait = min(wait, self.PollInterval())
+                complete = self.osc.WaitSRQ(max(0.0, wait))
+                if complete and self.wakes != self.armed_wakes:
+                    self.armed_wakes = self.wakes
+                    complete = self.osc.IsOperationComplete(events=False)
+                if self.ServiceCalls() or self.stopping or not self.acquiring:
+                    return None
+            else:
+                if self.ServiceCalls(wait) or self.stopping or not self.acquiring:
+                    return None
+                complete = self.osc.IsOperationComplete()
+            if complete:
+                break
+            if time.time() > deadline:
+                # Missed trigger or lost completion, start over
+                self.osc.Clear()
+                return None
+            self._status("Acquisition in progress...")
+            wait = self.PollInterval()
+
+        self._status("Acquisition complete!")
+        self.osc.dev.query("*ESR?")
+        first_step = -1
+        if self.steps > 0:
+            first_step = self.step_index
+            self.step_index += self.segments
+            if self.step_index >= self.steps:
+                # The stepped sweep is over, the next one starts from the first step
+                self.step_index = 0
+                self.sweeps += 1
+        try:
+            out = self.free_buffers.get_nowait()
+        except queue.Empty:
+            out = None
+        t = time.perf_counter()
+        if self.segments > 1:
+            data_t, codes, preamble = self.osc.GetSegmentedCodes(self.chan, self.segments, out)
+        else:
+            data_t, codes, preamble = self.osc.GetWaveformCodes(self.chan, out)
+        if self.steps == 0:
+            self.sweeps += max(1, self.segments, self.scope_avgn)
+        # Download time per sweep, smoothed
+        t = (time.perf_counter() - t)/max(1, self.segments)
+        self.transfer_time = t if self.transfer_time == 0 else 0.8*self.transfer_time + 0.2*t
+
+        return Record(data_t, codes, preamble, self.start_wl, self.stop_wl, self.speed, self.wl_table,
+                      self.t_offset, self.generation, first_step, self.steps, self.step_wl)
+
+    def ReduceLoop(self):
+        while True:
+            record = self.records.get()
+            if record is None:
+                break
+            try:
+                spectrum = self.Reduce(record)
+            except Exception as e:
+                print(f"Error processing the acquired data: {e}")
+                continue
+            if spectrum is None:
+                continue
+
+            with self.spectra_lock:
+                notify = self.spectra.empty()
+                if not notify:
+                    # Not rendered yet: the newer spectrum replaces it
+                    self.spectra.get_nowait()
+                self.spectra.put_nowait(spectrum)
+            if notify:
+                self.on_spectrum()
+
+    def Reduce(self, record):
+        if record.first_step >= 0:
+            return self.ReduceSteps(record)
+        data_t = record.data_t
+        # The time axis and the table are only replaced when they change, so the mapping is reused
+        key = (data_t, record.start_wl, record.speed, record.wl_table, record.t_offset)
+        if self.wl_axis_key is None or any(a is not b for a, b in zip(key, self.wl_axis_key)):
+            # Sample times count from the trigger, and the sweep starts t_offset later
+            self.wl_axis = wavelength_axis(data_t - record.t_offset, record.start_wl, record.speed, record.wl_table)
+            self.wl_axis_key = key
+        data_wl = self.wl_axis
+        start_index = np.abs(data_wl - record.start_wl).argmin()
+        stop_index = np.abs(data_wl - record.stop_wl).argmin() + 1
+        wls = data_wl[start_index:stop_index]
+        freqs = self.c/wls
+
+        has_data = bool(data_t.min() != data_t.max())
+        if record.preamble is None:
+            return Spectrum(wls, freqs, np.zeros(len(wls)), None, self.cal, self.dbclip, False)
+
+        # Codes are only comparable under the same vertical scale
+        p = record.preamble
+        scale = (p.yinc, p.yorigin, p.yref)
+        if record.generation != self.avg_generation or scale != self.avg_scale:
+            self.averager.Reset(self.avgn, self.avg_mode)
+            self.avg_generation = record.generation
+            self.avg_scale = scale
+
+        if record.codes.ndim == 2:
+            # A segmented burst: all its sweeps are averaged at once
+            self.averager.AddBlock(record.codes)
+        else:
+            self.averager.Add(record.codes)
+        self._recycle(record.codes)
+        codes = self.averager.Average(start_index, stop_index)
+
+        return Spectrum(wls, freqs, codes, p, self.cal, self.dbclip, has_data)
+
+    def ReduceSteps(self, record):
+        # Each segment of a stepped batch becomes the mean code at its step. None until the sweep is complete
+        if record.preamble is None:
+            return None
+        if record.first_step == 0 or len(self.step_values) != record.steps:
+            self.step_values = np.full(record.steps, np.nan)
+        n = len(record.codes)
+        self.step_values[record.first_step:record.first_step + n] = record.codes.mean(1)
+        self._recycle(record.codes)
+        if record.first_step + n < record.steps:
+            return None
+
+        p = record.preamble
+        scale = (p.yinc, p.yorigin, p.yref)
+        if record.generation != self.avg_generation or scale != self.avg_scale:
+            self.averager.Reset(self.avgn, self.avg_mode)
+            self.avg_generation = record.generation
+            self.avg_scale = scale
+        self.averager.Add(self.step_values)
+        wls = record.start_wl + np.arange(record.steps)*record.step_wl
+        return Spectrum(wls, self.c/wls, self.averager.Average(), p, self.cal, self.dbclip, True)
+
+    def _recycle(self, buf):
+        # Hand a record's memory back to the acquisition thread for the next download
+        try:
+            self.free_buffers.put_nowait(buf)
+        except queue.Full:
+            pass
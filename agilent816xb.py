@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import time
+import contextlib
+import numpy as np
 
 class Agilent816xb:
     # definitions
@@ -14,14 +17,30 @@ class Agilent816xb:
     dev = None
     devOK = False
     devID = ""
+    async_comm_man = None
+    adev = None
+    # Shadow keys written in the batch in progress, None outside of one
+    batch_keys = None
+
+    # Sweep parameter: (header, unit)
+    sweep_params = {"mode": ("mode", ""), "start": ("start", "nm"), "stop": ("stop", "nm"), "step": ("step", "nm"),
+                    "cycles": ("cycl", ""), "dwell": ("dwel", "ms"), "speed": ("spe", "nm/s")}
+    sweep_states = ["Stop", "Start", "Pause (Stepped)", "Continue (Stepped)"]
 
     # main functions
     def __init__(self, remote=False, rem_comm_man=None):
+        self.invalidateShadow()
+        self.shadow_hits = 0
+        self.shadow_misses = 0
+
         # This block is the only change needed to implement remote VISA support!
         self.remote = remote
         if self.remote:
             import remotevisa as visa
-            visa.commsMan = rem_comm_man
+            if isinstance(rem_comm_man, visa.AsyncCommsManager):
+                # Blocking calls run on the manager's event loop thread, self.adev is the awaitable device
+                self.async_comm_man = rem_comm_man
+                rem_comm_man = rem_comm_man.blocking
             if rem_comm_man == None:
                 print("Error: Remote is set to True, but no communication manager given! Create and start communications" + 
                       "with commsMan = remotevisa.CommsManager() and initialize communications." + 
@@ -30,7 +49,11 @@ class Agilent816xb:
             import pyvisa as visa
 
         try:
-            self.visarm = visa.ResourceManager()
+            if self.remote:
+                # Each instrument gets its own connection to the server
+                self.visarm = visa.ResourceManager(rem_comm_man)
+            else:
+                self.visarm = visa.ResourceManager()
             self.visaOK = True
         except:
             print("Error creating VISA Resource Manager! Are the VISA libraries installed?")
@@ -48,6 +71,7 @@ class Agilent816xb:
 
     # laser functions
     def connect(self, isgpib=True, address=17, iseth=False, ethip="192.168.1.2", ethport=10001, isusb=False):
+        self.invalidateShadow()
         if self.visaOK:
             self.gpib = isgpib
             self.gpibAddr = address
@@ -66,7 +90,10 @@ class Agilent816xb:
                 self.devID = self.dev.query("*IDN?")
                 if "816" in self.devID:
                     self.devOK = True
-                    
+                    if self.async_comm_man is not None:
+                        import remotevisa
+                        self.adev = remotevisa.AsyncResource(self.dev.comm_man.async_comm_man, self.dev)
+
                 else:
                     print("Error opening device! Is it connected?")
             except:
@@ -76,6 +103,71 @@ class Agilent816xb:
     def init(self):
         return 0
 
+    def writeCached(self, command):
+        """
+        Writes a "HEADER value" setting, unless the shadow says the laser already has it.
+        Every write of a cached header must go through here to keep the shadow right.
+        """
+        key = command.split(" ")[0]
+        if self.shadow.get(key) == command:
+            self.shadow_hits += 1
+        else:
+            self.shadow_misses += 1
+            # Only what reached the instrument is shadowed, so a failed setting is sent again next time
+            self.shadow.pop(key, None)
+            if self.dev.write(command) is not False:
+                self.shadow[key] = command
+                if self.batch_keys is not None:
+                    self.batch_keys.append(key)
+
+    def invalidateShadow(self):
+        self.shadow = {}
+
+    def getShadowStats(self):
+        return {"hits": self.shadow_hits, "misses": self.shadow_misses}
+
+    def clear(self):
+        if self.devOK:
+            self.dev.clear()
+            self.invalidateShadow()
+
+    def reset(self):
+        if self.devOK:
+            self.dev.write("*RST")
+            self.invalidateShadow()
+
+    def batch(self):
+        # Writes inside "with laser.batch():" go to the remote server in one round trip
+        if self.remote and self.devOK:
+            return self.remoteBatch()
+        else:
+            return contextlib.nullcontext()
+
+    @contextlib.contextmanager
+    def remoteBatch(self):
+        # A remote batch that takes back the shadow entries of writes that never got applied
+        outer = self.batch_keys is None
+        if outer:
+            self.batch_keys = []
+        try:
+            with self.dev.batch():
+                yield
+            if outer and self.dev.comm_man.batch_depth == 0:
+                for command, status in self.dev.comm_man.batch_errors:
+                    # "rc write <id> HEADER value"
+                    setting = command.split(" ", 3)[-1]
+                    key = setting.split(" ")[0]
+                    if self.shadow.get(key) == setting:
+                        self.shadow.pop(key)
+        except:
+            # The queued writes were dropped
+            for key in self.batch_keys:
+                self.shadow.pop(key, None)
+            raise
+        finally:
+            if outer:
+                self.batch_keys = None
+
     def enableAll(self):
         for i in range(0, 5):
              self.setState(i, True)
@@ -111,7 +203,7 @@ class Agilent816xb:
 
     def setPwr(self, slot, pwr):
         if self.devOK:
-            self.dev.write(f":sour{slot}:pow {pwr}")
+            self.writeCached(f":sour{slot}:pow {pwr}")
 
     def getState(self, slot):
         if self.devOK:
@@ -126,26 +218,93 @@ class Agilent816xb:
     def setState(self, slot, onoff):
         if self.devOK:
             if onoff:
-                self.dev.write(f":sour{slot}:pow:stat 1")
+                self.writeCached(f":sour{slot}:pow:stat 1")
             else:
-                self.dev.write(f":sour{slot}:pow:stat 0")
+                self.writeCached(f":sour{slot}:pow:stat 0")
+
+    def sweepCommand(self, slot, param, value):
+        header, unit = self.sweep_params[param]
+        return f":sour{slot}:wav:swe:{header} {value}{unit}"
 
     def setSweep(self, slot, mode, start, stop, step, cycles, dwell, speed):
+        """
+        Sets all the sweep parameters. cycles is how many times the laser repeats the
+        sweep by itself after a start, 0 for until it is stopped.
+        """
         if self.devOK:
             if mode != "CONT" and mode != "STEP":
                 mode = "CONT"
-            self.dev.write(f":sour{slot}:wav:swe:mode {mode}")
-            self.dev.write(f":sour{slot}:wav:swe:start {start}nm")
-            self.dev.write(f":sour{slot}:wav:swe:stop {stop}nm")
-            self.dev.write(f":sour{slot}:wav:swe:step {step}nm")
-            self.dev.write(f":sour{slot}:wav:swe:cycl {cycles}")
-            self.dev.write(f":sour{slot}:wav:swe:dwel {dwell}ms")
-            self.dev.write(f":sour{slot}:wav:swe:spe {speed}nm/s")
+            with self.batch():
+                for param, value in [("mode", mode), ("start", start), ("stop", stop), ("step", step),
+                                     ("cycles", cycles), ("dwell", dwell), ("speed", speed)]:
+                    self.writeCached(self.sweepCommand(slot, param, value))
+
+    def updateSweep(self, slot, **params):
+        """
+        Changes some of the sweep parameters (mode, start, stop, step, cycles, dwell, speed),
+        sending only those that differ from what the laser has. The laser takes no sweep
+        changes while sweeping, so a running sweep is stopped for them and restarted
+        right after, and only when something did change. Returns True if it did.
+        """
+        if not self.devOK:
+            return False
+        commands = [self.sweepCommand(slot, param, params[param]) for param in params]
+        if all(self.shadow.get(c.split(" ")[0]) == c for c in commands):
+            self.shadow_hits += len(commands)
+            return False
+
+        running = self.getSweepState(slot) == "Start"
+        if running:
+            self.setSweepState(slot, "Stop")
+            self.waitSweepState(slot, "Stop")
+        with self.batch():
+            for c in commands:
+                self.writeCached(c)
+            if running:
+                self.setSweepState(slot, "Start")
+        return True
+
+    def setSweepCycles(self, slot, cycles):
+        self.updateSweep(slot, cycles=int(cycles))
+
+    def getSweepCycles(self, slot):
+        if self.devOK:
+            resp = self.dev.query(f":sour{slot}:wav:swe:cycl?")
+            return int(float(resp))
+        else:
+            return 0
 
     def setSweepState(self, slot, state):
         if self.devOK:
-            options = ["Stop", "Start", "Pause (Stepped)", "Continue (Stepped)"]
-            self.dev.write(f":sour{slot}:wav:swe:stat {options.index(state)}")
+            self.dev.write(f":sour{slot}:wav:swe:stat {self.sweep_states.index(state)}")
+
+    def getSweepState(self, slot):
+        # "Stop", "Start" (sweeping) or "Pause (Stepped)"
+        if self.devOK:
+            resp = self.dev.query(f":sour{slot}:wav:swe:stat?")
+            try:
+                return self.sweep_states[int(float(resp))]
+            except:
+                return "Stop"
+        else:
+            return "Stop"
+
+    def waitSweepState(self, slot, state, timeout=5.0, interval=0.05):
+        # Polls the sweep state until it is state, for up to timeout seconds. Returns True if it got there
+        t0 = time.time()
+        while self.getSweepState(slot) != state:
+            if time.time() - t0 > timeout:
+                return False
+            time.sleep(interval)
+        return True
+
+    def checkSweep(self, slot):
+        # The laser's own check of the sweep parameters: "OK", or what is wrong with them
+        if self.devOK:
+            resp = self.dev.query(f":sour{slot}:wav:swe:chec?")
+            return resp.split(",", 1)[-1].strip().strip('"')
+        else:
+            return ""
 
     def setOutputTrigger(self, slot, state, mode="SWST"):
         """
@@ -160,8 +319,40 @@ class Agilent816xb:
         "SWST" means set the trigger for when the sweep starts
         """
         if self.devOK:
-            self.dev.write(f":trig:conf {state}")
-            self.dev.write(f":trig{slot}:outp {mode}")
+            with self.batch():
+                self.writeCached(f":trig:conf {state}")
+                self.writeCached(f":trig{slot}:outp {mode}")
+
+    def getOutputTrigger(self, slot):
+        # (trig:conf, output mode), to put them back after changing them
+        if self.devOK:
+            conf = self.dev.query(":trig:conf?").strip()
+            mode = self.dev.query(f":trig{slot}:outp?").strip()
+            return conf, mode
+        else:
+            return "", ""
+
+    def setLambdaLogging(self, slot, state):
+        """
+        Lambda logging: during a continuous sweep, the laser records its wavelength at
+        every output trigger, one per sweep step (needs the output trigger set to "STF").
+        """
+        if self.devOK:
+            self.writeCached(f":sour{slot}:wav:swe:llog {1 if state else 0}")
+
+    def getLambdaLog(self, slot):
+        # Wavelengths (nm) logged in the last sweep, read in binary (little-endian doubles, in m)
+        if self.devOK:
+            command = f":sour{slot}:read:data? llog"
+            try:
+                if self.remote:
+                    wls = self.dev.query_binary_array(command, datatype='d', is_big_endian=False)
+                else:
+                    wls = self.dev.query_binary_values(command, datatype='d', is_big_endian=False, container=np.array)
+                return np.asarray(wls, dtype=float)*1e9
+            except:
+                print("Error reading the logged wavelengths!")
+        return np.zeros(0)
 
     def SetWavelengthLocking(self, slot, state):
         """
@@ -172,6 +363,8 @@ class Agilent816xb:
         1 - wavelength locking
         """
         if self.devOK:
-            self.dev.write(f":sour{slot}:am:stat {state}")
+            # Changes the operating mode, so nothing we wrote before can be trusted
+            self.invalidateShadow()
+            self.writeCached(f":sour{slot}:am:stat {state}")
 
 
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""
+Created on Sun Oct 18 11:40 2026
+
+@author: pfjarschel
+"""
+
+import numpy as np
+
+# Where sweeps can be averaged, see choose_averaging
+strategies = ["Host", "Burst", "Scope", "Auto"]
+
+
+def choose_averaging(strategy, avgn, sweep_time, transfer_time, max_transfer_fraction=0.25):
+    """
+    Resolves strategy to where avgn sweeps are averaged:
+        Host: every sweep is downloaded and averaged by an Averager
+        Burst: the sweeps are captured into segmented memory and downloaded together
+        Scope: the scope averages them (ACQ:TYPE AVER) and only the average is downloaded
+        Auto: Scope if downloading a sweep takes more than max_transfer_fraction of the
+              sweep time (host averaging pays it every sweep, the scope once per avgn), else Host
+    """
+    if strategy not in strategies:
+        print(f"Unknown averaging strategy '{strategy}'. Averaging on the host.")
+        return "Host"
+    if avgn <= 1:
+        return "Host"
+    if strategy == "Auto":
+        return "Scope" if transfer_time > max_transfer_fraction*sweep_time else "Host"
+    return strategy
+
+
+class Averager():
+    """
+    Running average of sweeps, with a cost per new sweep that doesn't depend on the
+    number of averages. Modes:
+        Boxcar: mean of the last n sweeps, kept in a preallocated ring buffer with a running sum
+        Exponential: avg += (new - avg)/n, the smoothing of a boxcar of n without its memory
+        Cumulative: mean of every sweep since the last reset
+    Integer sweeps (raw scope codes) are stored as they are and summed exactly in int64,
+    so the ring takes a quarter of the memory of float64 volts. Exponential averaging
+    always runs in float64.
+    """
+    modes = ["Boxcar", "Exponential", "Cumulative"]
+
+    # A float boxcar sum is rebuilt from the ring after this many sweeps, so rounding can't pile up
+    resum_every = 1024
+
+    def __init__(self, n=1, mode="Boxcar"):
+        self.n = 1
+        self.mode = "Boxcar"
+        self.ring = np.zeros((0, 0))
+        self.sum = np.zeros(0)
+        self.exact = False
+        self.index = 0
+        self.count = 0
+        self.adds = 0
+        self.Reset(n, mode)
+
+    def Reset(self, n=None, mode=None):
+        if n is not None:
+            self.n = max(1, int(n))
+        if mode is not None:
+            if mode in self.modes:
+                self.mode = mode
+            else:
+                print(f"Unknown averaging mode '{mode}'. Keeping {self.mode}.")
+        self.index = 0
+        self.count = 0
+        self.adds = 0
+
+    def _allocate(self, points, dtype):
+        rows = self.n if self.mode == "Boxcar" else 0
+        self.exact = (np.dtype(dtype).kind in "iu") and self.mode != "Exponential"
+        sum_dtype = np.int64 if self.exact else np.float64
+        if self.sum.shape != (points,) or self.sum.dtype != sum_dtype:
+            self.sum = np.zeros(points, dtype=sum_dtype)
+        if self.ring.shape != (rows, points) or self.ring.dtype != dtype:
+            self.ring = np.zeros((rows, points), dtype=dtype)
+
+    def Add(self, y):
+        # Copies y in, so the caller may reuse its memory right away
+        if self.count > 0 and (len(y) != len(self.sum) or (self.mode == "Boxcar" and y.dtype != self.ring.dtype)):
+            self.Reset()
+        if self.count == 0:
+            self._allocate(len(y), y.dtype)
+            self.sum[:] = y
+            self.count = 1
+            if self.mode == "Boxcar":
+                self.ring[0] = y
+                self.index = 1 % self.n
+                self.adds = 1
+            return
+
+        if self.mode == "Boxcar":
+            if self.count == self.n:
+                self.sum -= self.ring[self.index]
+            else:
+                self.count += 1
+            self.ring[self.index] = y
+            self.sum += y
+            self.index = (self.index + 1) % self.n
+            self.adds += 1
+            if not self.exact and self.adds % self.resum_every == 0:
+                np.sum(self.ring[:self.count], 0, out=self.sum)
+        elif self.mode == "Exponential":
+            self.count += 1
+            self.sum += (y - self.sum)/min(self.count, self.n)
+        else:
+            self.sum += y
+            self.count += 1
+
+    def AddBlock(self, block):
+        """
+        Adds the rows of block as consecutive sweeps. A Boxcar block at least n rows long
+        replaces the whole window, and a Cumulative block is summed, each in one operation.
+        """
+        if self.count > 0 and (block.shape[1] != len(self.sum) or (self.mode == "Boxcar" and block.dtype != self.ring.dtype)):
+            self.Reset()
+        if self.mode == "Boxcar" and len(block) >= self.n:
+            self._allocate(block.shape[1], block.dtype)
+            self.ring[:] = block[-self.n:]
+            np.sum(self.ring, 0, out=self.sum)
+            self.index = 0
+            self.count = self.n
+            self.adds += len(block)
+        elif self.mode == "Cumulative" and len(block) > 0:
+            if self.count == 0:
+                self._allocate(block.shape[1], block.dtype)
+                self.sum[:] = 0
+            self.sum += np.sum(block, 0, dtype=self.sum.dtype)
+            self.count += len(block)
+        else:
+            for y in block:
+                self.Add(y)
+
+    def Average(self, start=0, stop=None):
+        # New array with the current average over [start:stop]
+        if self.count == 0:
+            return np.zeros(0)
+        if self.mode == "Exponential":
+            return self.sum[start:stop].copy()
+        return self.sum[start:stop]/self.count
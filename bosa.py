@@ -0,0 +1,708 @@
+# -*- coding: utf-8 -*-
+
+"""
+Created on Sun Oct 18 14:20 2026
+
+@author: pfjarschel
+
+Qt-free BOSA engine: the connection, the instruments and the acquisition worker.
+The GUI (LCO-HMBOSA.py) is a client of it, and so is the command line:
+
+    python -m bosa acquire --center 1558.6 --span 0.3 --avg 32 --count 1000 --out run.npz
+"""
+
+import sys, time, os.path
+import json
+import argparse
+import threading
+import numpy as np
+
+from remotevisa import CommsManager
+from acquisition import AcquisitionWorker
+from averaging import Averager, strategies, choose_averaging
+
+server_ip = "143.106.153.67"
+server_port = 8080
+# Fraction of the sweep time captured before the start and after the stop wavelengths
+roi_guard = 0.02
+# Wavelength step (nm) the record is sized for when no resolution is given
+default_resolution = 0.1e-3
+# Stepped sweeps: each step's record covers this fraction of the dwell, in this many points
+step_window = 0.2
+step_points = 100
+resource_cache_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resource_cache.json")
+
+
+def load_resource_cache(filename=resource_cache_file):
+    # Last known resource names, by instrument
+    try:
+        with open(filename, "r") as f:
+            return json.load(f)
+    except:
+        return {}
+
+
+def save_resource_cache(cache, filename=resource_cache_file):
+    try:
+        with open(filename, "w") as f:
+            json.dump(cache, f)
+    except:
+        print("Could not save the resource cache.")
+
+
+def sweep_settings(start, stop, speed, power=10.0, chan=1, coupling="AC", vrange=1.0, offset=0.0,
+                   acq_type="NORM", trig_source="EXT", trig_level=1.0, resolution=None, fmt="AUTO", lambda_log=False,
+                   step=0.0, dwell=0.05):
+    """
+    Everything needed to set up a sweep. The scope's time window covers the sweep from
+    start to stop (plus roi_guard on each side), so the record holds only the wavelengths
+    that are kept. resolution (nm) sets the record length to just what it takes to
+    sample the sweep that finely (default_resolution if None); 0 downloads the scope's
+    full normal record. fmt is the waveform transfer format: "BYTE", "WORD", or "AUTO"
+    to follow the acquisition type.
+    With lambda_log, the wavelength axis comes from the laser's own log of the sweep
+    (see BosaEngine.LogWavelengths) instead of assuming it is linear in time.
+    A step (nm) above 0 makes it a stepped sweep instead: the laser stops at every step
+    for dwell seconds, and the scope records a short step_points record at each stop.
+    """
+    sw_time = (stop - start)/speed
+    time_range = (1.0 + 2*roi_guard)*sw_time
+    time_delay = -roi_guard*sw_time
+    acq_time = max(0.0, time_delay + time_range)
+    if resolution is None:
+        resolution = default_resolution
+    points = 0
+    if resolution > 0:
+        points = int(np.ceil((1.0 + 2*roi_guard)*(stop - start)/resolution))
+    steps = 0
+    if step > 0:
+        steps = max(2, int(round((stop - start)/step)) + 1)
+        time_range = step_window*dwell
+        time_delay = 0.0
+        points = step_points
+        # Per step: the dwell, plus the move to the next step
+        acq_time = dwell + step/speed
+
+    return {"start": start, "stop": stop, "speed": speed, "power": power,
+            "time_range": time_range, "time_delay": time_delay, "points": points, "acq_time": acq_time,
+            "step": step, "steps": steps, "dwell": dwell,
+            "chan": chan, "coupling": coupling, "range": vrange, "offset": offset,
+            "acq_type": acq_type, "trig_source": trig_source, "trig_level": trig_level, "format": fmt,
+            "lambda_log": lambda_log}
+
+
+class BosaEngine():
+    """
+    Runs the HM-BOSA hardware: the laser sweeps, the oscilloscope records, and the
+    AcquisitionWorker turns the records into spectra. All instrument I/O happens on the
+    worker thread, so every method here returns right away and is safe to call from a GUI.
+    on_spectrum() is called (from a worker thread) when TakeSpectrum() has a new spectrum,
+    and on_status(msg) reports the acquisition progress.
+    """
+    connect_timeout = 5.0
+    init_timeout = 20.0
+    # Seconds Close waits for the worker to stop the instruments and end
+    close_timeout = 10.0
+
+    # Lambda logging: about this many steps per sweep, but steps no smaller than llog_min_step (nm)
+    llog_points = 10000
+    llog_min_step = 0.0001
+
+    def __init__(self, on_spectrum=None, on_status=None):
+        self.on_spectrum = on_spectrum
+        self.on_status = on_status
+        self.comm_man = CommsManager()
+        self.osc = None
+        self.laser = None
+        self.worker = None
+        self.running = False
+
+        # Averaging in use, set on the worker thread
+        self.averaging = "Host"
+        self.avgn = 1
+        self.avg_mode = "Boxcar"
+        self.acq_type = "NORM"
+        self.where = ""
+        self.stepped = False
+        self.trigger_out = None
+
+        # Delay (s) from the laser's sweep-start trigger to the start of the sweep, see MeasureLatency
+        self.trigger_latency = 0.0
+        self.last_sweep = None
+        self.sweep_state = "Stop"
+        self.sweep_cycles = 0
+        self.sweeps_at_start = 0
+
+        # Logged (times, wavelengths) tables, by (start, stop, speed)
+        self.wl_tables = {}
+
+    def Connect(self, ip=server_ip, port=server_port):
+        """
+        Connects to the remote VISA server and both instruments, and starts the worker
+        if both are there.
+        The instruments are opened in parallel, each over its own connection, and one
+        that hasn't answered within init_timeout seconds counts as failed.
+        The scope's resource name is cached on disk, to skip listing resources next time.
+        Returns (osc_ok, laser_ok).
+        """
+        self.comm_man.connect_timeout = self.connect_timeout
+        if not self.comm_man.StartCommunications(ip, port):
+            return False, False
+        self.comm_man.ResetVisa()
+
+        # The drivers are only needed from here on, so they don't slow down the GUI start
+        from agilent816xb import Agilent816xb
+        from keysightDSOX1200 import KeysightDSOX1200
+
+        cache = load_resource_cache()
+        self.trigger_latency = cache.get("trigger_latency", 0.0)
+        self.osc = KeysightDSOX1200(True, self.comm_man)
+        self.laser = Agilent816xb(True, self.comm_man)
+        opening = [threading.Thread(target=self.osc.connect, kwargs={"usb_hint": cache.get("osc", "")}, daemon=True),
+                   threading.Thread(target=self.laser.connect, args=(True, 20, False), daemon=True)]
+        t0 = time.time()
+        for t in opening:
+            t.start()
+        for t in opening:
+            t.join(max(0.0, t0 + self.init_timeout - time.time()))
+
+        osc_ok = self.osc.devOK and not opening[0].is_alive()
+        laser_ok = self.laser.devOK and not opening[1].is_alive()
+        # An open that is still running has failed. Its thread may set devOK later, so the
+        # instrument it works on is dropped for an unconnected one
+        if opening[0].is_alive():
+            self.osc = KeysightDSOX1200(True, self.comm_man)
+        if opening[1].is_alive():
+            self.laser = Agilent816xb(True, self.comm_man)
+        if osc_ok:
+            self.osc.dev.timeout = 10000
+            if cache.get("osc") != self.osc.resource_name:
+                cache["osc"] = self.osc.resource_name
+                save_resource_cache(cache)
+
+        # The worker needs both instruments, so it only starts if they both connected
+        if osc_ok and laser_ok:
+            self.worker = AcquisitionWorker(self.osc, self.laser, self._spectrum_ready, self._status)
+            self.worker.start()
+
+        return osc_ok, laser_ok
+
+    def Close(self):
+        """
+        Stops the instruments and the worker, then closes the connection. The laser is
+        always left stopped: if the worker hasn't done it within close_timeout, it is
+        stopped from here.
+        """
+        was_running = self.running
+        self.Stop()
+        if self.worker is not None:
+            stopped = threading.Event()
+            self.worker.Submit(stopped.set)
+            self.worker.Quit(self.close_timeout)
+            if was_running and not stopped.is_set():
+                print("The acquisition didn't end in time. Stopping the instruments directly.")
+                self.StopInstruments()
+            self.worker = None
+        self.comm_man.CloseCommunications()
+
+    def _spectrum_ready(self):
+        if self.on_spectrum is not None:
+            self.on_spectrum()
+
+    def _status(self, msg):
+        if self.on_status is not None:
+            self.on_status(msg)
+
+    def TakeSpectrum(self):
+        # Newest spectrum not taken yet, or None
+        if self.worker is None:
+            return None
+        return self.worker.TakeSpectrum()
+
+    def SkippedWrites(self):
+        # Redundant instrument writes avoided by the drivers' shadow caches
+        if self.osc is None or self.laser is None:
+            return 0
+        return self.osc.GetShadowStats()["hits"] + self.laser.getShadowStats()["hits"]
+
+    def SweepStatus(self):
+        """
+        Laser sweep state ("Stop", "Start", ...) and cycles setting (0 repeats until
+        stopped) as last read back, and the sweeps captured since it was started.
+        """
+        sweeps = self.worker.sweeps - self.sweeps_at_start if self.worker is not None else 0
+        return {"state": self.sweep_state, "cycles": self.sweep_cycles, "sweeps": sweeps}
+
+    # Requests, queued to the worker in the order they are made
+    def Start(self, sweep, avgn=1, avg_mode="Boxcar", cal=1.0, dbclip=-100.0, averaging="Host"):
+        """
+        Starts sweeping and acquiring. averaging says where the avgn sweeps are averaged
+        (see averaging.choose_averaging): each downloaded and averaged here (Host), captured
+        into segmented memory and downloaded together (Burst), averaged by the scope (Scope),
+        or Scope or Host depending on the measured download time (Auto).
+        """
+        if self.worker is not None and not self.running:
+            sweep = self._synced(sweep)
+            self._configure_sweep(sweep)
+            self.worker.Configure(cal=cal, dbclip=dbclip)
+            self.worker.Submit(self.StartInstruments, sweep)
+            self.worker.Submit(self.ApplyAveraging, averaging, avgn, avg_mode)
+            self.worker.StartAcquisition()
+            self.running = True
+
+    def Stop(self):
+        if self.worker is not None and self.running:
+            self.running = False
+            self.worker.StopAcquisition()
+            self.worker.Submit(self.StopInstruments)
+
+    def ChangeSweep(self, sweep):
+        if self.worker is not None and self.running:
+            sweep = self._synced(sweep)
+            self._configure_sweep(sweep)
+            self.worker.Submit(self.ApplySweep, sweep)
+            self.worker.Submit(self.RecheckAveraging)
+
+    def CalibrateLatency(self):
+        # Measures the trigger latency with the running sweep, and applies it (see MeasureLatency)
+        if self.worker is not None and self.running:
+            self.worker.Submit(self.MeasureLatency, self.last_sweep)
+
+    def ChangePower(self, power):
+        if self.worker is not None:
+            self.worker.Submit(self.ApplyPower, power)
+            if self.running:
+                self.worker.ResetAverages()
+
+    def ChangeVertical(self, sweep):
+        if self.worker is not None:
+            self.worker.Configure(chan=sweep["chan"])
+            self.worker.Submit(self.ApplyOscY, sweep)
+
+    def ChangeTrigger(self, sweep):
+        if self.worker is not None:
+            self.worker.Submit(self.ApplyTrigger, sweep)
+
+    def ChangeAcqType(self, acq_type):
+        if self.worker is not None:
+            self.worker.Submit(self.ApplyAcqType, acq_type)
+            if self.running:
+                self.worker.ResetAverages()
+
+    def ChangeAveraging(self, avgn, avg_mode="Boxcar", averaging="Host"):
+        if self.worker is not None and self.running:
+            self.worker.Submit(self.ApplyAveraging, averaging, avgn, avg_mode)
+
+    def ChangeProcessing(self, cal, dbclip):
+        if self.worker is not None:
+            self.worker.Configure(cal=cal, dbclip=dbclip)
+
+    def _synced(self, sweep):
+        # The sweep moved by the trigger latency (see _with_latency).
+        # Keeps it as it came in, for recalibrations
+        self.last_sweep = sweep
+        return self._with_latency(sweep)
+
+    def _with_latency(self, sweep):
+        """
+        The sweep with its continuous scope window moved by the current trigger latency,
+        so the window starts (roi_guard before) when the sweep does. The sweep may
+        already be moved by an older latency.
+        """
+        if sweep["steps"] > 0:
+            return dict(sweep, latency=0.0)
+        latency = sweep.get("latency", 0.0)
+        synced = dict(sweep, latency=self.trigger_latency)
+        synced["time_delay"] = sweep["time_delay"] - latency + self.trigger_latency
+        synced["acq_time"] = max(0.0, synced["time_delay"] + synced["time_range"])
+        return synced
+
+    def _sweep_config(self, sweep):
+        # Worker parameters for sweep
+        return {"chan": sweep["chan"], "start_wl": sweep["start"], "stop_wl": sweep["stop"],
+                "speed": sweep["speed"], "acq_time": sweep["acq_time"], "t_offset": sweep["latency"],
+                "steps": sweep["steps"], "step_wl": sweep["step"]}
+
+    def _configure_sweep(self, sweep):
+        self.worker.Configure(**self._sweep_config(sweep))
+        self.worker.ResetAverages()
+
+    # The methods below talk to the instruments, and are only run on the worker thread
+    def StartInstruments(self, sweep):
+        if sweep["steps"] > 0:
+            self.StartSteppedLaser(sweep)
+        else:
+            if self.stepped:
+                self.laser.setSweepState(0, "Stop")
+                self.laser.waitSweepState(0, "Stop")
+                self.stepped = False
+            self.SaveOutputTrigger()
+            with self.laser.batch():
+                self.laser.setState(0, True)
+                self.laser.setPwr(0, sweep["power"])
+                # The laser repeats the sweep by itself (0 cycles) until it is stopped
+                self.laser.setSweep(0, 'CONT', sweep["start"], sweep["stop"], 1, 0, 0, sweep["speed"])
+                # The scope triggers on the start of each sweep
+                self.laser.setOutputTrigger(0, 1, "SWST")
+                self.laser.setSweepState(0, "Start")
+            self.ReadSweepStatus()
+            self.ApplyWavelengthAxis(sweep)
+        self.sweeps_at_start = self.worker.sweeps
+
+        chan = sweep["chan"]
+        self.osc.Clear()
+        self.osc.SetWaveformFormat(sweep["format"])
+        with self.osc.Batch():
+            self.osc.SetTimeMode("MAIN")
+            self.osc.SetAcqMode("RTIM")
+            self.osc.SetTimeRef("LEFT")
+            self.osc.SetProbe(1, chan)
+            self.osc.SetTriggerMode("EDGE")
+            self.osc.SetTriggerSlope("POS")
+            self.osc.SetTriggerSweep("NORM")
+            self.osc.SetTimeRange(sweep["time_range"])
+            self.osc.SetTimeDelay(sweep["time_delay"])
+            self.osc.SetWaveformPoints(sweep["points"])
+
+            self.osc.SetCoupling(chan, sweep["coupling"])
+            self.osc.SetRange(sweep["range"], chan)
+            self.osc.SetOffset(sweep["offset"], chan)
+            self.osc.SetTriggerSource(sweep["trig_source"])
+            self.osc.SetTriggerLevel(sweep["trig_level"])
+        self.acq_type = sweep["acq_type"]
+        self.where = ""
+
+    def StartSteppedLaser(self, sweep):
+        """
+        Sets up one stepped sweep, triggering at every step (STF), but doesn't start it:
+        the worker runs it batch by batch (see AcquisitionWorker.SetupStepBatch).
+        """
+        self.SaveOutputTrigger()
+        self.stepped = True
+        self.worker.RestartSteps()
+        with self.laser.batch():
+            self.laser.setState(0, True)
+            self.laser.setPwr(0, sweep["power"])
+            self.laser.setSweep(0, 'STEP', sweep["start"], sweep["stop"], sweep["step"], 1, 1000*sweep["dwell"], sweep["speed"])
+            self.laser.setOutputTrigger(0, 1, "STF")
+        self.worker.Configure(wl_table=None)
+
+    def SaveOutputTrigger(self):
+        # The output trigger the laser had before we set it, to put it back when stopping
+        if self.trigger_out is None:
+            self.trigger_out = self.laser.getOutputTrigger(0)
+
+    def RestoreOutputTrigger(self):
+        if self.trigger_out is not None:
+            conf, mode = self.trigger_out
+            if mode != "":
+                self.laser.setOutputTrigger(0, conf, mode)
+            self.trigger_out = None
+        self.stepped = False
+
+    def ApplySweep(self, sweep):
+        if sweep["steps"] == 0 and sweep["latency"] != self.trigger_latency:
+            # The latency was recalibrated after this sweep was queued
+            sweep = self._with_latency(sweep)
+            self.worker._configure(**self._sweep_config(sweep))
+        if sweep["steps"] > 0 or self.stepped:
+            # Stepped sweeps start over with new settings, as does switching to or from them
+            self.StartInstruments(sweep)
+            self.ApplyAveraging(self.averaging, self.avgn, self.avg_mode)
+            return
+        with self.osc.Batch():
+            self.osc.SetTimeRange(sweep["time_range"])
+            self.osc.SetTimeDelay(sweep["time_delay"])
+            self.osc.SetWaveformPoints(sweep["points"])
+        # Only the parameters that changed are sent, and the laser only restarts if one did
+        if self.laser.updateSweep(0, start=sweep["start"], stop=sweep["stop"], speed=sweep["speed"]):
+            self.ReadSweepStatus()
+        self.ApplyWavelengthAxis(sweep)
+
+    def ApplyWavelengthAxis(self, sweep):
+        table = self.LogWavelengths(sweep) if sweep["lambda_log"] else None
+        self.worker.Configure(wl_table=table)
+
+    def LogWavelengths(self, sweep):
+        """
+        (times, wavelengths) of the sweep as the laser logged it, or None if that failed.
+        Runs one sweep with lambda logging on, triggering every step, then puts the
+        output trigger and the repeating sweep back. Tables are kept by sweep settings,
+        so each sweep configuration is only logged once.
+        """
+        key = (sweep["start"], sweep["stop"], sweep["speed"])
+        if key in self.wl_tables:
+            return self.wl_tables[key]
+
+        self._status("Logging the sweep wavelengths...")
+        step = max((sweep["stop"] - sweep["start"])/self.llog_points, self.llog_min_step)
+        sw_time = (sweep["stop"] - sweep["start"])/sweep["speed"]
+        conf, mode = self.laser.getOutputTrigger(0)
+        self.laser.updateSweep(0, step=step, cycles=1)
+        self.laser.setSweepState(0, "Stop")
+        self.laser.waitSweepState(0, "Stop")
+        self.laser.setOutputTrigger(0, 1, "STF")
+        self.laser.setLambdaLogging(0, True)
+        self.laser.setSweepState(0, "Start")
+        wls = np.zeros(0)
+        if self.laser.waitSweepState(0, "Stop", 2*sw_time + 5.0):
+            wls = self.laser.getLambdaLog(0)
+
+        self.laser.setLambdaLogging(0, False)
+        if mode != "":
+            self.laser.setOutputTrigger(0, conf, mode)
+        self.laser.updateSweep(0, step=1, cycles=0)
+        self.laser.setSweepState(0, "Start")
+        self.ReadSweepStatus()
+
+        if len(wls) < 2:
+            self._status("Could not log the sweep wavelengths, assuming a linear sweep")
+            return None
+        # One logged wavelength per step, and steps are step/speed apart from the start
+        table = (np.arange(len(wls))*step/sweep["speed"], wls)
+        self.wl_tables[key] = table
+        return table
+
+    def ReadSweepStatus(self):
+        self.sweep_state = self.laser.getSweepState(0)
+        self.sweep_cycles = self.laser.getSweepCycles(0)
+        if self.sweep_state != "Start":
+            check = self.laser.checkSweep(0)
+            self._status(f"The laser is not sweeping: {check}" if check not in ["", "OK"] else "The laser is not sweeping")
+
+    def ApplyAveraging(self, strategy, avgn, avg_mode):
+        self.averaging, self.avgn, self.avg_mode = strategy, avgn, avg_mode
+        if self.stepped:
+            # Stepped sweeps are captured into segments, and averaged here
+            with self.osc.Batch():
+                self.osc.SetAcqType(self.acq_type)
+                self.osc.SetAcqMode("SEGM")
+            self.worker.Configure(avgn=avgn, avg_mode=avg_mode, scope_avgn=0)
+            self.where = "Host"
+            return
+        transfer_time = self.TransferTime() if strategy == "Auto" and avgn > 1 else 0.0
+        where = choose_averaging(strategy, avgn, self.worker.acq_time, transfer_time)
+
+        segments = min(int(avgn), self.osc.max_segments) if where == "Burst" else 0
+        scope_avgn = int(avgn) if where == "Scope" else 0
+        with self.osc.Batch():
+            if where == "Scope":
+                self.osc.SetAcqMode("RTIM")
+                self.osc.SetAcqType("AVER")
+                self.osc.SetAvgs(scope_avgn)
+            else:
+                self.osc.SetAcqType(self.acq_type)
+                if where == "Burst":
+                    self.osc.SetAcqMode("SEGM")
+                    self.osc.SetSegments(segments)
+                else:
+                    self.osc.SetAcqMode("RTIM")
+        # Scope averages come in already averaged
+        self.worker.Configure(avgn=1 if where == "Scope" else avgn, avg_mode=avg_mode,
+                              segments=segments, scope_avgn=scope_avgn)
+        if where != self.where:
+            self.where = where
+            self._status(f"Averaging {avgn} sweeps on the {'scope' if where == 'Scope' else 'host'}" +
+                         (" (segmented burst)" if where == "Burst" else ""))
+
+    def RecheckAveraging(self):
+        # The sweep time changed, and with it the best place to average
+        if self.averaging == "Auto":
+            self.ApplyAveraging(self.averaging, self.avgn, self.avg_mode)
+
+    def TransferTime(self):
+        # Measured time to download one sweep, timing a download now if none was measured yet
+        if self.worker.transfer_time > 0:
+            return self.worker.transfer_time
+        t = time.perf_counter()
+        self.osc.GetWaveformCodes(self.worker.chan)
+        return time.perf_counter() - t
+
+    def ApplyAcqType(self, acq_type):
+        self.acq_type = acq_type
+        if self.where != "Scope":
+            self.osc.SetAcqType(acq_type)
+
+    def MeasureLatency(self, sweep, speed_ratio=2.0):
+        """
+        Measures the delay between the laser's sweep-start trigger and the sweep itself.
+        The strongest feature of the spectrum, at some wavelength wl0, shows up
+        latency + (wl0 - start)/speed after the trigger, so timing it at two speeds
+        gives the latency. The result is kept with the resource cache and applied.
+        """
+        if sweep is None or sweep["steps"] > 0:
+            return
+        self._status("Measuring the trigger latency...")
+        chan = sweep["chan"]
+        speeds = [sweep["speed"], sweep["speed"]/speed_ratio]
+        times = []
+        for speed in speeds:
+            sw_time = (sweep["stop"] - sweep["start"])/speed
+            # A generous window, as the latency is not known yet. One sweep per capture:
+            # scope averaging (AVER) is put back by ApplyAveraging at the end
+            with self.osc.Batch():
+                self.osc.SetAcqMode("RTIM")
+                self.osc.SetAcqType(self.acq_type)
+                self.osc.SetTimeRange(1.5*sw_time)
+                self.osc.SetTimeDelay(-0.1*sw_time)
+            self.laser.updateSweep(0, speed=speed)
+            self.osc.PrepareWait()
+            self.osc.Digitize()
+            if not self.osc.WaitOperation(0.1, int(10*(3*sw_time + 5.0)), 1.5*sw_time):
+                break
+            data_t, codes, preamble = self.osc.GetWaveformCodes(chan)
+            if preamble is None:
+                break
+            y = np.abs(codes - np.median(codes))
+            peak = y.argmax()
+            if y[peak] < 10*(np.median(y) + 1):
+                break
+            times.append(data_t[peak])
+
+        latency = None
+        if len(times) == 2:
+            latency = (times[0]*speeds[0] - times[1]*speeds[1])/(speeds[0] - speeds[1])
+            wl0 = sweep["start"] + (times[0] - latency)*speeds[0]
+            if not (sweep["start"] <= wl0 <= sweep["stop"]):
+                latency = None
+        if latency is None:
+            self._status("Could not measure the trigger latency, there is no clear peak in the sweep")
+        else:
+            self.trigger_latency = latency
+            cache = load_resource_cache()
+            cache["trigger_latency"] = latency
+            save_resource_cache(cache)
+            self._status(f"Trigger latency: {1000*latency:.2f} ms")
+
+        # Back to the newest sweep, with the window moved by the new latency. The worker is
+        # set directly, as a queued Configure would run after (and undo) sweep changes made meanwhile
+        synced = self._with_latency(self.last_sweep)
+        self.worker._configure(**self._sweep_config(synced))
+        self.worker._reset_averages()
+        self.ApplySweep(synced)
+        self.ApplyAveraging(self.averaging, self.avgn, self.avg_mode)
+
+    def ApplyPower(self, power):
+        # Not a sweep parameter, so the sweep goes on
+        self.laser.setPwr(0, power)
+
+    def ApplyOscY(self, sweep):
+        chan = sweep["chan"]
+        with self.osc.Batch():
+            self.osc.SetProbe(1, chan)
+            self.osc.SetCoupling(chan, sweep["coupling"])
+            self.osc.SetRange(sweep["range"], chan)
+            self.osc.SetOffset(sweep["offset"], chan)
+
+    def ApplyTrigger(self, sweep):
+        with self.osc.Batch():
+            self.osc.SetTriggerSource(sweep["trig_source"])
+            self.osc.SetTriggerLevel(sweep["trig_level"])
+
+    def StopInstruments(self):
+        with self.laser.batch():
+            self.laser.setSweepState(0, "Stop")
+            self.laser.setState(0, False)
+        self.sweep_state = "Stop"
+        self.RestoreOutputTrigger()
+
+
+def acquire(args):
+    sweep = sweep_settings(args.center - args.span/2.0, args.center + args.span/2.0, args.speed,
+                           args.power, args.chan, args.coupling, args.range, args.offset,
+                           args.acq_type, args.trigger, args.trigger_level, args.resolution*1e-3, args.format, args.lambda_log,
+                           args.step*1e-3, args.dwell*1e-3)
+
+    # Spectra are taken on the worker thread as soon as they are reduced, so none is skipped
+    spectra = []
+    times = []
+    done = threading.Event()
+    engine = BosaEngine(on_status=print if args.verbose else None)
+
+    def collect():
+        spectrum = engine.TakeSpectrum()
+        if spectrum is not None and not done.is_set():
+            spectra.append((spectrum.wls, spectrum.freqs, spectrum.volts.astype(np.float32)))
+            times.append(time.time())
+            if len(spectra) >= args.count:
+                done.set()
+    engine.on_spectrum = collect
+
+    osc_ok, laser_ok = engine.Connect(args.ip, args.port)
+    if not (osc_ok and laser_ok):
+        print("Error communicating with the " + ("oscilloscope" if not osc_ok else "laser") + "!")
+        engine.Close()
+        return 1
+
+    t0 = time.time()
+    engine.Start(sweep, args.avg, args.avg_mode, args.cal, args.dbclip, args.averaging)
+    if args.calibrate_latency:
+        engine.CalibrateLatency()
+    try:
+        while not done.wait(1.0):
+            print(f"{len(spectra)}/{args.count} spectra, {time.time() - t0:.1f} s")
+    except KeyboardInterrupt:
+        print("Interrupted, saving what was acquired")
+    done.set()
+    sweeps = engine.SweepStatus()["sweeps"]
+    engine.Close()
+
+    n = len(spectra)
+    if n == 0:
+        print("No spectra acquired")
+        return 1
+    points = min(len(s[2]) for s in spectra)
+    volts = np.stack([s[2][:points] for s in spectra])
+    mW = volts/args.cal
+    np.savez(args.out, wls=spectra[-1][0][:points], freqs=spectra[-1][1][:points], volts=volts, mW=mW,
+             dbm=10*np.log10(np.clip(mW, a_min=10**(args.dbclip/10.0), a_max=None)),
+             time=np.array(times) - t0, center=args.center, span=args.span, speed=args.speed,
+             power=args.power, avg=args.avg, avg_mode=args.avg_mode, averaging=args.averaging, cal=args.cal)
+    print(f"{n} spectra from {sweeps} sweeps saved to {args.out} ({n/(times[-1] - t0):.2f} spectra/s)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bosa", description="LCO HomeMade Brillouin Optical Spectrum Analyzer")
+    parser.add_argument("--ip", default=server_ip, help="remote VISA server address")
+    parser.add_argument("--port", type=int, default=server_port, help="remote VISA server port")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    acq = commands.add_parser("acquire", help="run sweeps and save the spectra to a .npz file",
+                              description="Each saved spectrum is the running average right after one sweep.")
+    acq.add_argument("--center", type=float, required=True, help="center wavelength (nm)")
+    acq.add_argument("--span", type=float, required=True, help="sweep span (nm)")
+    acq.add_argument("--speed", type=float, default=1.0, help="sweep speed (nm/s)")
+    acq.add_argument("--power", type=float, default=10.0, help="laser power (dBm)")
+    acq.add_argument("--chan", type=int, default=1, help="oscilloscope channel")
+    acq.add_argument("--coupling", default="AC", choices=["AC", "DC"])
+    acq.add_argument("--range", type=float, default=1.0, help="vertical range (V)")
+    acq.add_argument("--offset", type=float, default=0.0, help="vertical offset (V)")
+    acq.add_argument("--acq-type", default="NORM", choices=["NORM", "HRES", "PEAK"])
+    acq.add_argument("--trigger", default="EXT", help="trigger source (EXT, CHAN1, ...)")
+    acq.add_argument("--trigger-level", type=float, default=1.0, help="trigger level (V)")
+    acq.add_argument("--resolution", type=float, default=default_resolution*1e3,
+                     help="wavelength step to download (pm), 0 for the full normal record")
+    acq.add_argument("--format", default="AUTO", choices=["AUTO", "BYTE", "WORD"], help="waveform transfer format")
+    acq.add_argument("--lambda-log", action="store_true", help="take the wavelengths from the laser's lambda logging")
+    acq.add_argument("--step", type=float, default=0.0, help="stepped sweep with this step (pm), 0 for a continuous sweep")
+    acq.add_argument("--dwell", type=float, default=50.0, help="time at each step of a stepped sweep (ms)")
+    acq.add_argument("--calibrate-latency", action="store_true",
+                     help="measure the laser trigger latency first (needs a clear peak in the sweep), and keep it for later runs")
+    acq.add_argument("--avg", type=int, default=1, help="number of averages")
+    acq.add_argument("--avg-mode", default="Boxcar", choices=Averager.modes)
+    acq.add_argument("--averaging", default="Host", choices=strategies,
+                     help="where sweeps are averaged: host, segmented burst, scope, or Auto to pick scope or host")
+    acq.add_argument("--cal", type=float, default=1.0, help="calibration (V/mW)")
+    acq.add_argument("--dbclip", type=float, default=-30.0, help="lowest dBm value")
+    acq.add_argument("--count", type=int, default=1, help="number of spectra to save")
+    acq.add_argument("--out", required=True, help="output .npz file")
+    acq.add_argument("-v", "--verbose", action="store_true", help="print the acquisition status")
+    acq.set_defaults(run=acquire)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,16 +3,16 @@ import time
 import numpy as np
 import matplotlib.pyplot as plt
 
-remotevisa.commsMan = remotevisa.CommsManager()
-remotevisa.commsMan.StartCommunications("143.106.153.67", 8080)
-# remotevisa.commsMan.ResetVisa()
+commsMan = remotevisa.CommsManager()
+commsMan.StartCommunications("143.106.153.67", 8080)
+# commsMan.ResetVisa()
 
-rm = remotevisa.ResourceManager()
+rm = remotevisa.ResourceManager(commsMan)
 res_list = rm.list_resources()
 print(res_list)
 
 dev_id = ""
-dev = remotevisa.Resource()
+dev = remotevisa.Resource(commsMan)
 for i in range(len(res_list)):
     if ("0x2A8D" in res_list[i]) and ("0x0396" in res_list[i]):
         dev_id = res_list[i]
@@ -87,4 +87,4 @@ plt.show()
 
 
 dev.close()
-remotevisa.commsMan.CloseCommunications()
\ No newline at end of file
+commsMan.CloseCommunications()
\ No newline at end of file
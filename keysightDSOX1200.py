@@ -1,9 +1,29 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 import time
+import contextlib
+from typing import NamedTuple
 
 visa = None
 
+class WaveformPreamble(NamedTuple):
+    """Fields of the WAV:PRE? reply, in the order the scope sends them"""
+    format: int     # 0 BYTE, 1 WORD, 4 ASCii
+    type: int       # 0 NORMal, 1 PEAK, 2 AVERage, 3 HRESolution
+    points: int
+    count: int
+    xinc: float
+    xorigin: float
+    xref: float
+    yinc: float
+    yorigin: float
+    yref: float
+
+    @classmethod
+    def parse(cls, resp):
+        fields = resp.split(",")
+        return cls(*[int(float(f)) for f in fields[:4]], *[float(f) for f in fields[4:10]])
+
 class KeysightDSOX1200:
     # definitions
     remote = False
@@ -18,18 +38,42 @@ class KeysightDSOX1200:
     dev = None
     devOK = False
     devID = ""
+    async_comm_man = None
+    adev = None
     usbid_hex = "0x2A8D::0x0396"
     usbid_dec = "10893::918"
     
     init_ESE = 255
 
+    # Most segments the acquisition memory can be split into
+    max_segments = 1000
+
+    # Record lengths WAV:POIN accepts, in NORMal points mode
+    waveform_points = [100, 250, 500, 1000, 2000, 5000, 10000, 20000, 50000, 62500]
+
+    x_axis = None
+    x_axis_key = None
+    srq_events = False
+    waveform_format = "AUTO"
+    resource_name = ""
+    probe_timeout = 2000
+    # Shadow keys written in the batch in progress, None outside of one
+    batch_keys = None
+
     # main functions
     def __init__(self, remote=False, rem_comm_man=None):
+        self.InvalidateShadow()
+        self.shadow_hits = 0
+        self.shadow_misses = 0
+
         # This block is the only change needed to implement remote VISA support!
         self.remote = remote
         if self.remote:
             import remotevisa as visa
-            visa.commsMan = rem_comm_man
+            if isinstance(rem_comm_man, visa.AsyncCommsManager):
+                # Blocking calls run on the manager's event loop thread, self.adev is the awaitable device
+                self.async_comm_man = rem_comm_man
+                rem_comm_man = rem_comm_man.blocking
             if rem_comm_man == None:
                 print("Error: Remote is set to True, but no communication manager given! Create and start communications" + 
                       "with commsMan = remotevisa.CommsManager() and initialize communications." + 
@@ -38,7 +82,11 @@ class KeysightDSOX1200:
             import pyvisa as visa
 
         try:
-            self.visarm = visa.ResourceManager()
+            if self.remote:
+                # Each instrument gets its own connection to the server
+                self.visarm = visa.ResourceManager(rem_comm_man)
+            else:
+                self.visarm = visa.ResourceManager()
             self.visaOK = True
         except:
             print("Error creating VISA Resource Manager! Are the VISA libraries installed?")
@@ -54,7 +102,14 @@ class KeysightDSOX1200:
         self.close()
         return 0
 
-    def connect(self, isgpib=False, address=17, iseth=False, ethip="192.168.1.1", ethport=10001, isusb=True):
+    def connect(self, isgpib=False, address=17, iseth=False, ethip="192.168.1.1", ethport=10001, isusb=True, usb_hint=""):
+        """
+        Opens the scope. Over USB, usb_hint (the resource name it had last time) is tried
+        first, and the resources are only listed if it doesn't answer as a DSOX.
+        The name that worked is kept in resource_name.
+        """
+        self.InvalidateShadow()
+        self.srq_events = False
         if self.visaOK:
             self.gpib = isgpib
             self.gpibAddr = address
@@ -70,24 +125,115 @@ class KeysightDSOX1200:
                     name = "TCPIP0::" + self.ip + "::INSTR"
                     self.dev = self.visarm.open_resource(name, read_termination="\r\n", timeout=5000)
                 elif self.usb:
-                    devs_list = self.visarm.list_resources()
-                    for dev_name in devs_list:
-                        if (self.usbid_hex in dev_name) or (self.usbid_dec in dev_name):
-                            self.dev = self.visarm.open_resource(dev_name)
-                            break
+                    if not self.ProbeResource(usb_hint):
+                        devs_list = self.visarm.list_resources()
+                        for dev_name in devs_list:
+                            if (self.usbid_hex in dev_name) or (self.usbid_dec in dev_name):
+                                self.dev = self.visarm.open_resource(dev_name)
+                                break
                 
                 self.devID = self.dev.query("*IDN?")
                 if "DSOX" in self.devID:
                     self.devOK = True
+                    self.resource_name = self.dev.resource_name
+                    if self.async_comm_man is not None:
+                        import remotevisa
+                        self.adev = remotevisa.AsyncResource(self.dev.comm_man.async_comm_man, self.dev)
                 else:
                     print("Error opening device! Is it connected?")
             except:
                 print("Error opening device! Is it connected?")
                 pass
 
+    def ProbeResource(self, name):
+        # Opens name and keeps it as self.dev if it answers as a DSOX within probe_timeout
+        if name == "" or name is None:
+            return False
+        try:
+            dev = self.visarm.open_resource(name)
+            # A stale remote name comes back unopened, and must not be queried or closed
+            if getattr(dev, "rem_id", 0) is not None:
+                timeout = dev.timeout
+                dev.timeout = self.probe_timeout
+                idn = dev.query("*IDN?")
+                if idn and "DSOX" in idn:
+                    dev.timeout = timeout
+                    self.dev = dev
+                    return True
+                dev.close()
+        except:
+            pass
+        print(f"{name} is not the oscilloscope anymore. Searching for it...")
+        return False
+
     def init(self):
         pass
 
+    def WriteCached(self, command):
+        """
+        Writes a "HEADER value" setting, unless the shadow says the scope already has it.
+        Every write of a cached header must go through here to keep the shadow right.
+        """
+        key = command.split(" ")[0]
+        if self.shadow.get(key) == command:
+            self.shadow_hits += 1
+        else:
+            self.shadow_misses += 1
+            # Only what reached the instrument is shadowed, so a failed setting is sent again next time
+            self.shadow.pop(key, None)
+            if self.dev.write(command) is not False:
+                self.shadow[key] = command
+                if self.batch_keys is not None:
+                    self.batch_keys.append(key)
+
+    def InvalidateShadow(self):
+        self.shadow = {}
+
+    def GetShadowStats(self):
+        return {"hits": self.shadow_hits, "misses": self.shadow_misses}
+
+    def Clear(self):
+        if self.devOK:
+            self.dev.clear()
+            self.InvalidateShadow()
+
+    def Reset(self):
+        if self.devOK:
+            self.dev.write("*RST")
+            self.InvalidateShadow()
+
+    def Batch(self):
+        # Writes inside "with osc.Batch():" go to the remote server in one round trip
+        if self.remote and self.devOK:
+            return self.RemoteBatch()
+        else:
+            return contextlib.nullcontext()
+
+    @contextlib.contextmanager
+    def RemoteBatch(self):
+        # A remote batch that takes back the shadow entries of writes that never got applied
+        outer = self.batch_keys is None
+        if outer:
+            self.batch_keys = []
+        try:
+            with self.dev.batch():
+                yield
+            if outer and self.dev.comm_man.batch_depth == 0:
+                for command, status in self.dev.comm_man.batch_errors:
+                    # "rc write <id> HEADER value"
+                    setting = command.split(" ", 3)[-1]
+                    key = setting.split(" ")[0]
+                    if self.shadow.get(key) == setting:
+                        self.shadow.pop(key)
+        except:
+            # The queued writes were dropped
+            for key in self.batch_keys:
+                self.shadow.pop(key, None)
+            raise
+        finally:
+            if outer:
+                self.batch_keys = None
+
     def close(self):
         if self.devOK:
             self.devOK = False
@@ -98,19 +244,36 @@ class KeysightDSOX1200:
         if self.devOK:
             chan = (int(np.abs(chan)) % 5)
             curr_chan = self.dev.query("WAV:SOUR?")
-            self.dev.write(f"WAV:SOUR CHAN{chan}")
+            self.WriteCached(f"WAV:SOUR CHAN{chan}")
             resp = self.dev.query(f"WAV:POIN?")
-            self.dev.write(f"WAV:SOUR {curr_chan}")
+            self.WriteCached(f"WAV:SOUR {curr_chan}")
             points = int(resp)
             return points
         else:
             return 0
 
+    def SetWaveformPoints(self, points=0):
+        """
+        Sets how many points WAV:DATA? returns for the time window on screen: the
+        shortest normal record with at least points samples, or the longest one
+        (waveform_points[-1]) if points is 0. The raw record (WAV:POIN:MODE MAX) is never
+        used, as it can be the whole acquisition memory.
+        Returns the record length asked for.
+        """
+        if self.devOK:
+            allowed = [n for n in self.waveform_points if n >= points]
+            n = allowed[0] if points > 0 and len(allowed) > 0 else self.waveform_points[-1]
+            with self.Batch():
+                self.WriteCached("WAV:POIN:MODE NORM")
+                self.WriteCached(f"WAV:POIN {n}")
+            return n
+        return 0
+
     def SetCoupling(self, chan=1, coupl="DC"):
         if self.devOK:
             chan = (int(np.abs(chan)) % 5)
             if coupl == "DC" or coupl=="AC":
-                self.dev.write(f"CHAN{chan}:COUP {coupl}")
+                self.WriteCached(f"CHAN{chan}:COUP {coupl}")
 
     def GetCoupling(self, chan=1):
         if self.devOK:
@@ -126,7 +289,7 @@ class KeysightDSOX1200:
             if val < 0.1: val = 0.1
             if val > 10000: val - 10000
 
-            self.dev.write(f"CHAN{chan}:PROB {val}")
+            self.WriteCached(f"CHAN{chan}:PROB {val}")
 
     def GetProbe(self, chan=1):
         if self.devOK:
@@ -139,7 +302,7 @@ class KeysightDSOX1200:
     def SetRange(self, val, chan=1):
         if self.devOK:
             chan = (int(np.abs(chan)) % 5)
-            self.dev.write(f"CHAN{chan}:RANG {np.abs(val)}")
+            self.WriteCached(f"CHAN{chan}:RANG {np.abs(val)}")
 
     def GetRange(self, chan=1):
         if self.devOK:
@@ -152,7 +315,7 @@ class KeysightDSOX1200:
     def SetOffset(self, val, chan=1):
         if self.devOK:
             chan = (int(np.abs(chan)) % 5)
-            self.dev.write(f"CHAN{chan}:OFFS {np.abs(val)}")
+            self.WriteCached(f"CHAN{chan}:OFFS {np.abs(val)}")
 
     def GetOffset(self, chan=1):
         if self.devOK:
@@ -165,7 +328,7 @@ class KeysightDSOX1200:
     def SetTimeMode(self, mode="MAIN"):
         if self.devOK:
             if mode=="MAIN" or mode=="WIND" or mode=="XY" or mode=="ROLL":
-                self.dev.write(f"TIM:MODE {mode}")
+                self.WriteCached(f"TIM:MODE {mode}")
 
     def GetTimeMode(self):
         if self.devOK:
@@ -176,7 +339,7 @@ class KeysightDSOX1200:
 
     def SetTimeRange(self, val):
         if self.devOK:
-            self.dev.write(f"TIM:RANG {np.abs(val)}")
+            self.WriteCached(f"TIM:RANG {np.abs(val)}")
 
     def GetTimeRange(self):
         if self.devOK:
@@ -187,7 +350,7 @@ class KeysightDSOX1200:
 
     def SetTimeDelay(self, val):
         if self.devOK:
-            self.dev.write(f"TIM:DEL {val}")
+            self.WriteCached(f"TIM:DEL {val}")
 
     def GetTimeDelay(self):
         if self.devOK:
@@ -199,7 +362,7 @@ class KeysightDSOX1200:
     def SetTimeRef(self, mode="LEFT"):
         if self.devOK:
             if mode=="LEFT" or mode=="CENTER" or mode=="RIGHT":
-                self.dev.write(f"TIM:REF {mode}")
+                self.WriteCached(f"TIM:REF {mode}")
 
     def GetTimeRef(self):
         if self.devOK:
@@ -211,7 +374,7 @@ class KeysightDSOX1200:
     def SetAcqMode(self, mode="RTIM"):
         if self.devOK:
             if mode=="RTIM" or mode=="SEGM":
-                self.dev.write(f"ACQ:MODE {mode}")
+                self.WriteCached(f"ACQ:MODE {mode}")
 
     def GetAcqMode(self):
         if self.devOK:
@@ -220,10 +383,23 @@ class KeysightDSOX1200:
         else:
             return ""
 
+    def SetSegments(self, count):
+        # Number of triggers captured, one per segment, in ACQ:MODE SEGM
+        if self.devOK:
+            count = max(2, min(int(count), self.max_segments))
+            self.WriteCached(f"ACQ:SEGM:COUN {count}")
+
+    def GetSegments(self):
+        if self.devOK:
+            resp = self.dev.query(f"ACQ:SEGM:COUN?")
+            return int(resp)
+        else:
+            return 0
+
     def SetAcqType(self, mode="NORM"):
         if self.devOK:
             if mode=="NORM" or mode=="AVER" or mode=="HRES" or mode=="PEAK":
-                self.dev.write(f"ACQ:TYPE {mode}")
+                self.WriteCached(f"ACQ:TYPE {mode}")
 
     def GetAcqType(self):
         if self.devOK:
@@ -236,7 +412,7 @@ class KeysightDSOX1200:
         if self.devOK:
             if val < 1: val = 1
             if val > 65536: val = 65536
-            self.dev.write(f"ACQ:COUN {int(val)}")
+            self.WriteCached(f"ACQ:COUN {int(val)}")
 
     def GetAvgs(self):
         if self.devOK:
@@ -248,7 +424,7 @@ class KeysightDSOX1200:
     def SetTriggerSource(self, src="EXT"):
         if self.devOK:
             if "CHAN" in src or src=="EXT" or src=="LINE" or src=="WGEN":
-                self.dev.write(f"TRIG:SOUR {src}")
+                self.WriteCached(f"TRIG:SOUR {src}")
 
     def GetTriggerSource(self):
         if self.devOK:
@@ -260,7 +436,7 @@ class KeysightDSOX1200:
     def SetTriggerMode(self, mode="EDGE"):
         if self.devOK:
             if mode=="EDGE" or mode=="GLITCH" or mode=="PATT" or mode=="SHOL" or mode=="TRAN" or mode=="TV" or mode=="SBUS1":
-                self.dev.write(f"TRIG:MODE {mode}")
+                self.WriteCached(f"TRIG:MODE {mode}")
 
     def GetTriggerMode(self):
         if self.devOK:
@@ -272,7 +448,7 @@ class KeysightDSOX1200:
     def SetTriggerSweep(self, mode="NORM"):
         if self.devOK:
             if mode=="NORM" or mode=="AUTO":
-                self.dev.write(f"TRIG:SWE {mode}")
+                self.WriteCached(f"TRIG:SWE {mode}")
 
     def GetTriggerSweep(self):
         if self.devOK:
@@ -283,7 +459,7 @@ class KeysightDSOX1200:
 
     def SetTriggerLevel(self, val):
         if self.devOK:
-            self.dev.write(f"TRIG:LEV {val}")
+            self.WriteCached(f"TRIG:LEV {val}")
 
     def GetTriggerLevel(self):
         if self.devOK:
@@ -295,7 +471,7 @@ class KeysightDSOX1200:
     def SetTriggerSlope(self, mode="POS"):
         if self.devOK:
             if mode=="POS" or mode=="NEG" or mode=="EITH" or mode=="ALT":
-                self.dev.write(f"TRIG:SLOP {mode}")
+                self.WriteCached(f"TRIG:SLOP {mode}")
 
     def GetTriggerSlope(self):
         if self.devOK:
@@ -324,47 +500,180 @@ class KeysightDSOX1200:
         if self.devOK:
             self.dev.write(f"RUN")
 
-    def GetDataX(self, chan=1):
+    def GetPreamble(self, chan=0):
+        """
+        Gets all waveform scaling information with a single WAV:PRE? query.
+        chan=0 keeps the current waveform source.
+        """
         if self.devOK:
-            chan = (int(np.abs(chan)) % 5)
-            self.dev.write(f"WAV:SOUR CHAN{chan}")
-            points = self.GetPoints(chan)
-            xinc = float(self.dev.query("WAV:XINC?"))
-            x0 = float(self.dev.query("WAV:XOR?"))
-            xref = int(self.dev.query("WAV:XREF?"))
-            x_data = (np.linspace(0, points - 1, points) - xref)*xinc + x0
-
-            return x_data
+            if chan != 0:
+                chan = (int(np.abs(chan)) % 5)
+                self.WriteCached(f"WAV:SOUR CHAN{chan}")
+            try:
+                return WaveformPreamble.parse(self.dev.query("WAV:PRE?"))
+            except:
+                print("Error reading the waveform preamble!")
+                return None
         else:
-            return np.zeros(101)
+            return None
+
+    def GetTimeAxis(self, preamble):
+        # Reused as long as the preamble describes the same time base
+        key = (preamble.points, preamble.xinc, preamble.xorigin, preamble.xref)
+        if key != self.x_axis_key:
+            x_data = (np.arange(preamble.points, dtype=float) - preamble.xref)*preamble.xinc + preamble.xorigin
+            x_data.flags.writeable = False
+            self.x_axis = x_data
+            self.x_axis_key = key
+        return self.x_axis
+
+    def ScaleCodes(self, codes, preamble, out=None):
+        # (codes - yref)*yinc + y0, in place into out when its shape matches
+        if out is None or out.shape != codes.shape:
+            out = np.empty(codes.shape)
+        np.subtract(codes, preamble.yref, out=out)
+        out *= preamble.yinc
+        out += preamble.yorigin
+        return out
 
-    def GetDataY_BIN(self, chan=1):
+    def GetDataX(self, chan=1):
         if self.devOK:
-            chan = (int(np.abs(chan)) % 5)
-            self.dev.write(f"WAV:SOUR CHAN{chan}")
-            self.dev.write("WAV:FORM WORD")
-            self.dev.write("WAV:UNS 1")
-            endianess = self.dev.query("WAV:BYT?")
-            yinc = float(self.dev.query("WAV:YINC?"))
-            y0 = float(self.dev.query("WAV:YOR?"))
-            yref = float(self.dev.query("WAV:YREF?"))
-            if endianess == "MSBF":
-                big_endian = True
-            else:
-                big_endian = False
-            
-            bytes_array = np.array(self.dev.query_binary_values("WAV:DATA?", datatype='H', is_big_endian=big_endian))
-            y_data = (bytes_array - yref)*yinc + y0
+            preamble = self.GetPreamble(chan)
+            if preamble is not None:
+                return self.GetTimeAxis(preamble)
+        return np.zeros(101)
 
-            return y_data
+    def QueryCodes(self, command, datatype='H', big_endian=False):
+        # Raw sample codes as a NumPy array, straight from the receive buffer when remote
+        if self.remote:
+            return self.dev.query_binary_array(command, datatype=datatype, is_big_endian=big_endian)
         else:
-            return np.zeros(101)
+            return self.dev.query_binary_values(command, datatype=datatype, is_big_endian=big_endian, container=np.array)
+
+    def SetWaveformFormat(self, fmt="AUTO"):
+        # "BYTE" or "WORD" forces the transfer format, "AUTO" lets TransferFormat pick it
+        if fmt=="AUTO" or fmt=="BYTE" or fmt=="WORD":
+            self.waveform_format = fmt
+
+    def TransferFormat(self):
+        """
+        Format that carries the samples without losing resolution: BYTE when they have
+        the ADC's 8 bits (NORMal and PEAK acquisitions, AVERage of one sweep), WORD when
+        the scope computed more (HRESolution, AVERage). Half the bytes of WORD whenever
+        possible. The acquisition settings come from the shadow, so this rarely queries.
+        """
+        if self.waveform_format != "AUTO":
+            return self.waveform_format
+        acq_type = self.CachedSetting("ACQ:TYPE")
+        if acq_type.startswith("HRES"):
+            return "WORD"
+        if acq_type.startswith("AVER"):
+            count = self.CachedSetting("ACQ:COUN")
+            return "WORD" if count == "" or int(float(count)) > 1 else "BYTE"
+        return "BYTE"
+
+    def CachedSetting(self, header):
+        # Value of a setting, from the shadow if it was written, else read once and kept there
+        command = self.shadow.get(header)
+        if command is None:
+            value = self.dev.query(f"{header}?").strip()
+            if value == "":
+                return ""
+            command = f"{header} {value}"
+            self.shadow[header] = command
+        return command.split(" ")[-1].upper()
+
+    def SelectTransfer(self, chan=1, fmt="WORD"):
+        # Unsigned MSB-first BYTE or WORD records from chan, without resending unchanged settings
+        with self.Batch():
+            self.WriteCached(f"WAV:SOUR CHAN{chan}")
+            self.WriteCached(f"WAV:FORM {fmt}")
+            self.WriteCached("WAV:UNS 1")
+            self.WriteCached("WAV:BYT MSBF")
+
+    def ReadCodes(self, chan=1, fmt=None):
+        # (preamble, codes) of one transfer, uint8 for BYTE and uint16 for WORD. Preamble None on failure
+        if fmt is None:
+            fmt = self.TransferFormat()
+        self.SelectTransfer(chan, fmt)
+        preamble = self.GetPreamble()
+        if preamble is None:
+            return None, None
+        return preamble, self.QueryCodes("WAV:DATA?", 'B' if fmt == "BYTE" else 'H', True)
+
+    def GetWaveform(self, chan=1, out=None, fmt=None):
+        """
+        Returns (time, volts) of a channel from one preamble query and one BYTE or WORD
+        transfer (see TransferFormat, or force one with fmt). The time axis is cached and
+        must not be modified. If out is a float array with the right length, the volts
+        are written into it.
+        """
+        if self.devOK:
+            chan = (int(np.abs(chan)) % 5)
+            preamble, codes = self.ReadCodes(chan, fmt)
+            if preamble is not None:
+                return self.GetTimeAxis(preamble), self.ScaleCodes(codes, preamble, out)
+        return np.zeros(101), np.zeros(101)
+
+    def GetWaveformCodes(self, chan=1, out=None, fmt=None):
+        """
+        Returns (time, codes, preamble) of a channel, with the raw codes (uint8 from BYTE
+        transfers, uint16 from WORD), for callers that accumulate them as integers and
+        scale only the result (see ScaleCodes). If out is an array of the same length and
+        type, the codes are copied into it. The preamble is None if nothing could be read.
+        """
+        if self.devOK:
+            chan = (int(np.abs(chan)) % 5)
+            preamble, codes = self.ReadCodes(chan, fmt)
+            if preamble is not None:
+                dtype = codes.dtype.newbyteorder("=")
+                if out is None or out.shape != codes.shape or out.dtype != dtype:
+                    out = np.empty(codes.shape, dtype=dtype)
+                np.copyto(out, codes)
+                return self.GetTimeAxis(preamble), out, preamble
+        return np.zeros(101), np.zeros(101, dtype=np.uint16), None
+
+    def GetSegmentedCodes(self, chan=1, count=2, out=None, fmt=None):
+        """
+        Returns (time, codes, preamble) of the last segmented acquisition, with the codes
+        of the count segments as the rows of one array (see GetWaveformCodes). All the
+        segments come in a single transfer (WAV:SEGM:ALL); if the scope sends only the
+        current one, they are read one by one instead. If out is an array of the same
+        shape and type, the codes are copied into it. The preamble is None on failure.
+        """
+        if self.devOK:
+            chan = (int(np.abs(chan)) % 5)
+            self.WriteCached("WAV:SEGM:ALL 1")
+            preamble, codes = self.ReadCodes(chan, fmt)
+            if preamble is not None and len(codes) > 0:
+                dtype = codes.dtype.newbyteorder("=")
+                points = preamble.points
+                if out is None or out.shape != (count, points) or out.dtype != dtype:
+                    out = np.empty((count, points), dtype=dtype)
+
+                if len(codes) >= count*points:
+                    np.copyto(out, codes[:count*points].reshape(count, points))
+                else:
+                    # Only the current segment came, so read them one per transfer
+                    datatype = 'B' if dtype.itemsize == 1 else 'H'
+                    for i in range(count):
+                        self.dev.write(f"ACQ:SEGM:INDEX {i + 1}")
+                        out[i] = self.QueryCodes("WAV:DATA?", datatype, True)[:points]
+                return self.GetTimeAxis(preamble), out, preamble
+        return np.zeros(101), np.zeros((count, 101), dtype=np.uint16), None
+
+    def GetDataY_BIN(self, chan=1, out=None):
+        """
+        Downloads the channel record in BYTE or WORD format and returns it in volts.
+        If out is a float array with the right length, the scaling is done in place into it.
+        """
+        return self.GetWaveform(chan, out)[1]
 
     def GetDataY_ASC(self, chan=1):
         if self.devOK:
             chan = (int(np.abs(chan)) % 5)
-            self.dev.write(f"WAV:SOUR CHAN{chan}")
-            self.dev.write("WAV:FORM ASC")
+            self.WriteCached(f"WAV:SOUR CHAN{chan}")
+            self.WriteCached("WAV:FORM ASC")
             asc_data = self.dev.query("WAV:DATA?")
             double_spaces = True
             while double_spaces:
@@ -381,31 +690,87 @@ class KeysightDSOX1200:
         self.dev.write("STOP")
         self.dev.query("*ESR?")
         self.dev.query("*OPC?")
-        # self.init_ESE = int(self.dev.query("*ESE?"))
-        # self.dev.write("*ESE 1")
-    
-    def WaitOperation(self, interval=1.0, max_n=20):
+        # Only Operation Complete sets ESB, and ESB raises a service request
+        with self.Batch():
+            self.WriteCached("*ESE 1")
+            self.WriteCached("*SRE 32")
+        if not self.srq_events:
+            self.srq_events = self.EnableSRQEvents()
+
+    def EnableSRQEvents(self):
+        # Service requests pushed to us (remote server events or VISA event queue)
+        if self.remote:
+            return self.dev.enable_srq()
+        else:
+            try:
+                import pyvisa.constants
+                self.dev.enable_event(pyvisa.constants.EventType.service_request, pyvisa.constants.EventMechanism.queue)
+                return True
+            except:
+                return False
+
+    def WaitSRQ(self, timeout=0.0):
+        # Timeout in seconds, 0 just checks
+        if self.remote:
+            return self.dev.wait_for_srq(timeout*1000)
+        else:
+            try:
+                import pyvisa.constants
+                self.dev.wait_on_event(pyvisa.constants.EventType.service_request, int(timeout*1000))
+                return True
+            except:
+                return False
+
+    def WakeSRQ(self):
+        # Makes a pending WaitSRQ return True early. Returns False if the wait can't be woken (local VISA)
+        if self.remote and self.srq_events:
+            self.dev.wake_srq()
+            return True
+        return False
+
+    def NotifyWhenDone(self):
+        # Operation Complete is flagged once the pending DIG/SING is over
+        if self.srq_events:
+            self.WaitSRQ(0)
         self.dev.write("*OPC")
-        
-        complete = False
-        n = 0
-        stb0 = 0
-        changes = 0
-        while (not complete) and n < max_n:
-            stb = int(self.dev.read_stb())
-            print(stb, changes)
-            if n == 0:
-                stb0 = stb
-            else:
-                if stb != stb0:
-                    stb0 = stb
-                    changes += 1
-            complete = changes > 0
-            n += 1
-            time.sleep(interval)
+
+    def IsOperationComplete(self, events=True):
+        # Non-blocking: checks the pushed service request when available, otherwise reads the status byte
+        if self.srq_events and events:
+            return self.WaitSRQ(0)
+        else:
+            return (int(self.dev.read_stb()) & 32) != 0
+
+    def WaitOperation(self, interval=1.0, max_n=20, expected_time=0.0):
+        """
+        Waits up to interval*max_n seconds for the pending operation, returning True if it completed.
+        Without service request events, the status byte is polled, starting at expected_time
+        and then every tenth of it (at most every interval). With them, it is read once per
+        service request, as a woken wait is not a completion.
+        """
+        self.NotifyWhenDone()
+        timeout = interval*max_n
+
+        if self.srq_events:
+            # WakeSRQ also ends the wait, so the status byte confirms that the operation is over
+            t0 = time.time()
+            complete = False
+            while (not complete) and (time.time() - t0 < timeout):
+                if self.WaitSRQ(max(0.0, t0 + timeout - time.time())):
+                    complete = self.IsOperationComplete(events=False)
+        else:
+            t0 = time.time()
+            time.sleep(min(expected_time, timeout))
+            poll = interval
+            if expected_time > 0:
+                poll = min(interval, max(0.005, expected_time/10.0))
+            complete = self.IsOperationComplete()
+            while (not complete) and (time.time() - t0 < timeout):
+                time.sleep(poll)
+                complete = self.IsOperationComplete()
 
         self.dev.query("*ESR?")
-        # self.dev.write(f"*ESE {self.init_ESE}")
+        return complete
 
     def ReadSystError(self):
         return self.dev.query("SYST:ERR?")
\ No newline at end of file
@@ -1,9 +1,36 @@
 import socket as sck
-import pyvisa.constants
-import pyvisa.util
+import struct
+import contextlib
+import asyncio
+import threading
+import numpy as np
 
 
-commsMan = None
+# Framed replies start with the payload length as an unsigned 64 bit big-endian integer
+frame_header = struct.Struct(">Q")
+
+def parse_block_header(block):
+    """
+    Returns (data offset, announced data length) of an IEEE 488.2 definite length block.
+    Data without a valid header is taken as raw, starting at offset 0.
+    """
+    head = bytes(block[:11])
+    if len(head) >= 2 and head[0:1] == b"#" and head[1:2].isdigit():
+        ndigits = int(head[1:2])
+        if ndigits > 0 and len(head) >= 2 + ndigits and head[2:2 + ndigits].isdigit():
+            offset = 2 + ndigits
+            return offset, int(head[2:offset])
+    return 0, len(block)
+
+def binary_block_to_array(block, datatype='f', is_big_endian=False):
+    """
+    Decodes an IEEE 488.2 binary block into a NumPy array sharing memory with block.
+    datatype follows the struct format characters used by pyvisa.
+    """
+    dtype = np.dtype(datatype).newbyteorder(">" if is_big_endian else "<")
+    offset, length = parse_block_header(block)
+    length = min(length, len(block) - offset)
+    return np.frombuffer(block, dtype, length//dtype.itemsize, offset)
 
 class CommsManager():
     def __init__(self):
@@ -11,15 +38,32 @@ class CommsManager():
         self.remhost_port = 8080
         self.s = sck.socket(sck.AF_INET, sck.SOCK_STREAM, sck.IPPROTO_TCP)
         self.commsOK = False
+        self.framed = False
+        self.batching = False
+        self.batch_depth = 0
+        self.batch_queue = []
+        self.batch_errors = []
+        self.negotiation_timeout = 2.0
+        self.connect_timeout = None
+        self.rx_buf = bytearray(1048576)
+        self.pool = {}
+        self.root = self
+        self.events = None
+        self.lock = threading.RLock()
 
     def __del__(self):
         self.CloseCommunications()
 
     def StartCommunications(self, ip, port):   
         self.commsOK = False
+        self.framed = False
+        self.batching = False
         self.remhost_addr = ip
         self.remhost_port = port
         try:
+            if self.s.fileno() < 0:
+                self.s = sck.socket(sck.AF_INET, sck.SOCK_STREAM, sck.IPPROTO_TCP)
+            self.s.settimeout(self.connect_timeout)
             self.s.connect((ip, port))
             resp = self.s.recv(1024)
             if resp:
@@ -27,13 +71,27 @@ class CommsManager():
                 self.commsOK = True
         except:
             print("Error connecting to the selected server! Check if it is running on the remote machine, and if IP address and port are correct.")
+        finally:
+            self.s.settimeout(None)
+
+        if self.commsOK:
+            self.framed = self.Negotiate("framing")
+            self.batching = self.Negotiate("batch")
 
         return self.commsOK
 
     def CloseCommunications(self):
+        for conn in self.pool.values():
+            conn.CloseCommunications()
+        self.pool = {}
+        if self.events is not None:
+            self.events.Stop()
+            self.events = None
         try:
             self.s.close()
             self.commsOK = False
+            self.framed = False
+            self.batching = False
         except:
             print("Error closing the connection. Maybe it was already down?")
 
@@ -41,16 +99,220 @@ class CommsManager():
         self.CloseCommunications()
         return self.StartCommunications(ip, port)
 
+    def GetConnection(self, key):
+        """
+        Returns a dedicated connection to the same server for key (a resource name),
+        opening it on first use, so independent instruments don't wait for each other.
+        Falls back to this connection if the server doesn't accept another one.
+        """
+        with self.lock:
+            if key in self.pool:
+                return self.pool[key]
+        # Connect without holding the lock, so connections for other keys open in parallel
+        conn = CommsManager()
+        conn.root = self.root
+        conn.connect_timeout = self.negotiation_timeout
+        if not conn.StartCommunications(self.remhost_addr, self.remhost_port):
+            print(f"Could not open a dedicated connection for {key}. Sharing the main one.")
+            return self
+        with self.lock:
+            if key in self.pool:
+                # Another thread opened one for key meanwhile
+                conn.CloseCommunications()
+            else:
+                self.pool[key] = conn
+            return self.pool[key]
+
+    def StartEvents(self):
+        """
+        Opens the event connection shared by all connections to this server, on which
+        the server pushes service requests. Returns the EventListener, or None if the
+        server can't push events.
+        """
+        if self.root is not self:
+            return self.root.StartEvents()
+        if self.events is None:
+            listener = EventListener()
+            if listener.Start(self.remhost_addr, self.remhost_port, self.negotiation_timeout):
+                self.events = listener
+        return self.events
+
+    def Negotiate(self, feature):
+        """
+        Ask the server to enable an optional protocol feature ("framing" for length
+        prefixed replies, "batch" for grouped writes). Servers that don't know it
+        answer with an error, or not at all, and the feature stays off.
+        """
+        enabled = False
+        try:
+            self.s.settimeout(self.negotiation_timeout)
+            self.s.sendall(f"srv {feature} 1".encode('Latin1'))
+            resp = bytes(self._recv_reply(1024)).decode("Latin1").strip()
+            enabled = (resp == f"{feature} 1")
+        except sck.timeout:
+            pass
+        except:
+            print(f"Error negotiating '{feature}' with the server. Leaving it disabled.")
+        finally:
+            self.s.settimeout(None)
+
+        return enabled
+
     def ResetVisa(self):
         self.remote_write("srv visarst")
 
+    def _reserve_rx(self, size, keep=0):
+        # Grow by reallocating, so views handed out from the old buffer stay valid
+        if len(self.rx_buf) < size:
+            new_buf = bytearray(max(size, 2*len(self.rx_buf)))
+            new_buf[:keep] = self.rx_buf[:keep]
+            self.rx_buf = new_buf
+
+    def _recv_into(self, nbytes, offset=0):
+        # Fill rx_buf[offset:offset + nbytes] completely
+        self._reserve_rx(offset + nbytes, offset)
+        view = memoryview(self.rx_buf)[offset:offset + nbytes]
+        while len(view) > 0:
+            n = self.s.recv_into(view)
+            if n == 0:
+                raise ConnectionError("Connection closed by the server")
+            view = view[n:]
+
+    def _recv_block_unframed(self, length):
+        # Without framing the only length information is the IEEE 488.2 block header,
+        # so keep reading until the whole block announced by it has arrived.
+        # A terminator left over from the previous block may precede the header.
+        start, n = self._recv_unframed(length)
+        if n == 0 or self.rx_buf[start:start + 1] != b"#":
+            return memoryview(self.rx_buf)[start:n]
+        if n < start + 2:
+            self._recv_into(start + 2 - n, n)
+            n = start + 2
+        total = n
+        if self.rx_buf[start + 1:start + 2].isdigit():
+            ndigits = int(self.rx_buf[start + 1:start + 2])
+            if ndigits > 0:
+                if n < start + 2 + ndigits:
+                    self._recv_into(start + 2 + ndigits - n, n)
+                    n = start + 2 + ndigits
+                total = max(n, start + 2 + ndigits + int(self.rx_buf[start + 2:start + 2 + ndigits]))
+                if total > n:
+                    self._recv_into(total - n, n)
+                    n = total
+        return memoryview(self.rx_buf)[start:total]
+
+    def _recv_unframed(self, length):
+        # The termination sent after a block may arrive at the start of the next reply,
+        # or on its own. Returns (start, end) of the reply in rx_buf, skipping it.
+        self._reserve_rx(length)
+        while True:
+            n = self.s.recv_into(memoryview(self.rx_buf)[:length])
+            start = 0
+            while start < n and self.rx_buf[start] in b"\r\n":
+                start += 1
+            if n == 0 or start < n:
+                return start, n
+
+    def _recv_reply(self, length=1048576, block=False):
+        # Returns a view over rx_buf, valid until the next reply is received
+        if self.framed:
+            self._recv_into(frame_header.size)
+            size, = frame_header.unpack_from(self.rx_buf)
+            self._recv_into(size)
+            return memoryview(self.rx_buf)[:size]
+        elif block:
+            return self._recv_block_unframed(length)
+        else:
+            start, n = self._recv_unframed(length)
+            return memoryview(self.rx_buf)[start:n]
+
+    def _transact(self, command, length=1048576, block=False):
+        # One request/reply exchange. Raises on communication errors
+        self.s.sendall(command.encode('Latin1'))
+        return self._recv_reply(length, block)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Queue every remote_write issued inside the block and send them together
+        when it ends, in a single round trip if the server supports batches.
+        Queries flush the queue first, so ordering is always kept.
+        If the block raises, the queued writes are dropped.
+        The connection is held by the calling thread until the block ends.
+        """
+        with self.lock:
+            self.batch_depth += 1
+            try:
+                yield self
+            except:
+                self.batch_depth -= 1
+                if self.batch_depth == 0:
+                    self.batch_queue = []
+                raise
+            else:
+                self.batch_depth -= 1
+                if self.batch_depth == 0:
+                    self.flush_batch()
+
+    def flush_batch(self):
+        """
+        Sends the queued writes. Returns a list with the success of each command,
+        and keeps the (command, error) pairs of the failed ones in batch_errors.
+        """
+        with self.lock:
+            return self._flush_batch_locked()
+
+    def _flush_batch_locked(self):
+        commands = self.batch_queue
+        self.batch_queue = []
+        self.batch_errors = []
+        if len(commands) == 0:
+            return []
+
+        results = []
+        if self.batching and self.commsOK:
+            try:
+                resp = bytes(self._transact("srv batch\n" + "\n".join(commands))).decode("Latin1").strip().split("\n")
+                for i in range(len(commands)):
+                    status = resp[i].strip() if i < len(resp) else "Error: no status received"
+                    ok = not (("Error" in status) or ("error" in status))
+                    if not ok:
+                        print(f"{commands[i]}: {status}")
+                        self.batch_errors.append((commands[i], status))
+                    results.append(ok)
+            except:
+                print("Error communicating with the server. Try restarting the connection and/or the server.")
+                self.batch_errors = [(command, "Communication error") for command in commands]
+                results = [False]*len(commands)
+        else:
+            for command in commands:
+                ok = self._remote_write_now(command)
+                if not ok:
+                    self.batch_errors.append((command, "Write failed"))
+                results.append(ok)
+
+        return results
+
     def remote_write(self, command):
+        with self.lock:
+            if self.batch_depth > 0:
+                self.batch_queue.append(command)
+                return True
+            else:
+                return self._remote_write_now(command)
+
+    def _remote_write_now(self, command):
+        with self.lock:
+            return self._remote_write_locked(command)
+
+    def _remote_write_locked(self, command):
         if self.commsOK:
             try:
-                self.s.sendall(command.encode('Latin1'))
-                resp = self.s.recv(1024).decode("Latin1")
+                resp = bytes(self._transact(command, 1024)).decode("Latin1")
                 if resp:
-                    if ("Error" in resp) or ("error" in resp): print(resp)
+                    if ("Error" in resp) or ("error" in resp):
+                        print(resp)
+                        return False
                     return True
                 else:
                     return False
@@ -61,14 +323,22 @@ class CommsManager():
             print("Communications are down. Try (re)starting the communications and/or the server.")
             return False
 
-    def remote_read_binary_values(self, command, length=1048576):
+    def remote_read_binary_view(self, command, length=1048576):
+        # The returned view is overwritten by the next reply on this connection,
+        # so it is only safe for a thread that owns the connection (a per-device one)
+        with self.lock:
+            return self._remote_read_binary_view_locked(command, length)
+
+    def _remote_read_binary_view_locked(self, command, length):
+        if len(self.batch_queue) > 0:
+            self.flush_batch()
         if self.commsOK:
             try:
-                self.s.sendall(command.encode('Latin1'))
-                resp = self.s.recv(length)
-                if resp:
-                    resp_l1 = resp.decode("Latin1")
-                    if ("Error" in resp_l1) or ("error" in resp_l1): print(resp_l1)
+                resp = self._transact(command, length, block=True)
+                if len(resp) > 0:
+                    if resp[0:1] != b"#":
+                        resp_l1 = bytes(resp).decode("Latin1")
+                        if ("Error" in resp_l1) or ("error" in resp_l1): print(resp_l1)
                     return resp
                 else:
                     return False
@@ -79,11 +349,34 @@ class CommsManager():
             print("Communications are down. Try (re)starting the communications and/or the server.")
             return False
 
+    def remote_write_read_binary_view(self, command, read_command, length=1048576):
+        # Writes command, then reads read_command's binary reply, with no other request in between
+        with self.lock:
+            if len(self.batch_queue) > 0:
+                self.flush_batch()
+            return self._write_read_binary_locked(command, read_command, length)
+
+    def _write_read_binary_locked(self, command, read_command, length):
+        self._remote_write_locked(command)
+        return self._remote_read_binary_view_locked(read_command, length)
+
+    def remote_read_binary_values(self, command, length=1048576):
+        resp = self.remote_read_binary_view(command, length)
+        if resp:
+            return bytes(resp)
+        else:
+            return False
+
     def remote_query(self, command, length=1048576):
+        with self.lock:
+            return self._remote_query_locked(command, length)
+
+    def _remote_query_locked(self, command, length):
+        if len(self.batch_queue) > 0:
+            self.flush_batch()
         if self.commsOK:
             try:
-                self.s.sendall(command.encode('Latin1'))
-                resp = self.s.recv(length).decode("Latin1").rstrip()
+                resp = bytes(self._transact(command, length)).decode("Latin1").strip()
                 if resp:
                     if ("Error" in resp) or ("error" in resp): print(resp)
                     return resp
@@ -96,35 +389,122 @@ class CommsManager():
             print("Communications are down. Try (re)starting the communications and/or the server.")
             return False
 
-class ResourceManager():
+class EventListener():
+    """
+    Dedicated connection on which the server pushes events, one "srq <resource name>"
+    line per service request, so completion doesn't have to be polled with read_stb.
+    """
     def __init__(self):
-        pass
+        self.s = sck.socket(sck.AF_INET, sck.SOCK_STREAM, sck.IPPROTO_TCP)
+        self.running = False
+        self.thread = None
+        self.lock = threading.Lock()
+        self.flags = {}
+
+    def Start(self, ip, port, timeout=2.0):
+        try:
+            self.s.settimeout(timeout)
+            self.s.connect((ip, port))
+            self.s.recv(1024)
+            self.s.sendall("srv events 1".encode('Latin1'))
+            resp = self.s.recv(1024).decode("Latin1").strip()
+            self.running = (resp == "events 1")
+        except:
+            self.running = False
+        finally:
+            self.s.settimeout(None)
+
+        if self.running:
+            self.thread = threading.Thread(target=self._listen, daemon=True)
+            self.thread.start()
+        else:
+            print("The server doesn't push events. Falling back to polling.")
+            self.s.close()
+        return self.running
+
+    def Stop(self):
+        self.running = False
+        try:
+            self.s.shutdown(sck.SHUT_RDWR)
+            self.s.close()
+        except:
+            pass
+
+    def flag(self, resource_name):
+        # threading.Event set whenever resource_name requests service
+        with self.lock:
+            if resource_name not in self.flags:
+                self.flags[resource_name] = threading.Event()
+            return self.flags[resource_name]
+
+    def _listen(self):
+        pending = b""
+        while self.running:
+            try:
+                data = self.s.recv(4096)
+            except:
+                break
+            if not data:
+                break
+            lines = (pending + data).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                fields = line.decode("Latin1").strip().split(" ", 1)
+                if len(fields) == 2 and fields[0] == "srq":
+                    self.flag(fields[1]).set()
+        self.running = False
+
+def open_defaults(access_mode, open_timeout):
+    # pyvisa's defaults for open_resource, imported on first use to keep this module light
+    import pyvisa.constants
+    if access_mode is None:
+        access_mode = pyvisa.constants.AccessModes.no_lock
+    if open_timeout is None:
+        open_timeout = pyvisa.constants.VI_TMO_IMMEDIATE
+    return access_mode, open_timeout
+
+def parse_open_reply(reply, resource_name, new_dev):
+    # Reply to "rm open_resource": "<id> <timeout> '<read term>' '<write term>'"
+    reply_list = reply.split(" ")
+    new_dev.rem_id = int(reply_list[0])
+    new_dev._timeout = reply_list[1]
+    new_dev._read_termination = reply_list[2][1:-1]
+    new_dev._write_termination = reply_list[3][1:-1]
+    new_dev.resource_name = resource_name
+    return new_dev
+
+class ResourceManager():
+    def __init__(self, comm_man, per_resource=True):
+        # With per_resource, every opened resource talks over its own connection
+        self.comm_man = comm_man
+        self.per_resource = per_resource
 
     def list_resources(self, query="?*::INSTR"):
-        rem_list = commsMan.remote_query(f"rm list_resources {query}")
+        rem_list = self.comm_man.remote_query(f"rm list_resources {query}")
         if rem_list:
             return rem_list.split("\n")
 
-    def open_resource(self, resource_name, access_mode=pyvisa.constants.AccessModes.no_lock, open_timeout=pyvisa.constants.VI_TMO_IMMEDIATE, **kwargs):
-        reply = commsMan.remote_query(f"rm open_resource {resource_name} {access_mode} {open_timeout}")
+    def open_resource(self, resource_name, access_mode=None, open_timeout=None, **kwargs):
+        access_mode, open_timeout = open_defaults(access_mode, open_timeout)
+        if self.per_resource:
+            conn = self.comm_man.GetConnection(resource_name)
+        else:
+            conn = self.comm_man
+        reply = conn.remote_query(f"rm open_resource {resource_name} {access_mode} {open_timeout}")
         try:
-            reply_list = reply.split(" ")
-            dev_id = int(reply_list[0])
-            new_dev = Resource()
-            new_dev.rem_id = dev_id
-            new_dev._timeout = reply_list[1]
-            new_dev._read_termination = reply_list[2][1:-1]
-            new_dev._write_termination = reply_list[3][1:-1]
-            new_dev.resource_name = resource_name
-            return new_dev
+            return parse_open_reply(reply, resource_name, Resource(conn))
         except:
             print(f"Error received: {reply}")
-            return Resource()
+            # Not opened: rem_id None never addresses (or closes) another instrument's id
+            dev = Resource(conn)
+            dev.rem_id = None
+            return dev
 
     ## TODO: implement all properties/methods
 
 class Resource():
-    def __init__(self):
+    def __init__(self, comm_man=None):
+        self.comm_man = comm_man
         self._timeout = 0
         self._read_termination = ""
         self._write_termination = ""
@@ -146,51 +526,500 @@ class Resource():
     @timeout.setter
     def timeout(self, new_timeout):
         self._timeout = new_timeout
-        commsMan.remote_write(f"rc timeout {self.rem_id} {new_timeout}")
+        self.comm_man.remote_write(f"rc timeout {self.rem_id} {new_timeout}")
 
     @read_termination.setter
     def read_termination(self, new_read_termination):
         self._read_termination = new_read_termination
-        commsMan.remote_write(f"rc read_termination {self.rem_id} {new_read_termination}")
+        self.comm_man.remote_write(f"rc read_termination {self.rem_id} {new_read_termination}")
 
     @write_termination.setter
     def write_termination(self, new_write_termination):
         self._write_termination = new_write_termination
-        commsMan.remote_write(f"rc write_termination {self.rem_id} {new_write_termination}")
+        self.comm_man.remote_write(f"rc write_termination {self.rem_id} {new_write_termination}")
 
     def close(self):
-        commsMan.remote_write(f"rc close {self.rem_id}")
+        if self.rem_id is not None:
+            self.comm_man.remote_write(f"rc close {self.rem_id}")
 
     def open(self):
-        self.rem_id = int(commsMan.remote_query(f"rc open {self.resource_name}"))
+        self.rem_id = int(self.comm_man.remote_query(f"rc open {self.resource_name}"))
 
     def clear(self):
-        commsMan.remote_write(f"rc clear {self.rem_id}")
+        self.comm_man.remote_write(f"rc clear {self.rem_id}")
 
     def write(self, command):
-        commsMan.remote_write(f"rc write {self.rem_id} {command}")
+        # False if the write failed. Inside a batch it is only queued, see CommsManager.batch_errors
+        return self.comm_man.remote_write(f"rc write {self.rem_id} {command}")
     
     def read(self, length=1048576):
-        return commsMan.remote_query(f"rc read {self.rem_id}", length)
+        return self.comm_man.remote_query(f"rc read {self.rem_id}", length)
 
     def read_binary_values(self, datatype='f', is_big_endian=False, header_fmt='ieee', expect_termination=True, data_points=-1, chunk_size=None):
         command = f"rc read_binary_values {self.rem_id} {datatype} {is_big_endian} {header_fmt} {expect_termination} {data_points} {chunk_size}"
-        return commsMan.remote_read_binary_values(command)
+        return self.comm_man.remote_read_binary_values(command)
 
     def query(self, command, length=1048576):
-        return commsMan.remote_query(f"rc query {self.rem_id} {command}", length)
+        return self.comm_man.remote_query(f"rc query {self.rem_id} {command}", length)
 
     def query_binary_values(self, command, datatype='f', is_big_endian=False, header_fmt='ieee', expect_termination=True, data_points=-1, chunk_size=None):
-        commsMan.remote_write(f"rc write {self.rem_id} {command}")
         read_command = f"rcb read_binary_values {self.rem_id} {datatype} {is_big_endian} {header_fmt} {expect_termination} {data_points} {chunk_size}"
-        binary_resp = commsMan.remote_read_binary_values(read_command)
-        resp = pyvisa.util.from_binary_block(binary_resp, offset=0, datatype=datatype, is_big_endian=is_big_endian)
+        binary_resp = self.comm_man.remote_write_read_binary_view(f"rc write {self.rem_id} {command}", read_command)
+        binary_resp = bytes(binary_resp) if binary_resp else b""
+        import pyvisa.util
+        offset, length = parse_block_header(binary_resp)
+        length = min(length, len(binary_resp) - offset)
+        resp = pyvisa.util.from_binary_block(binary_resp, offset=offset, data_length=length, datatype=datatype, is_big_endian=is_big_endian)
         return resp
 
+    def query_binary_array(self, command, datatype='f', is_big_endian=False, header_fmt='ieee', expect_termination=True, data_points=-1, chunk_size=None):
+        """
+        Same as query_binary_values, but returns a NumPy array viewing the receive buffer
+        directly, with no copies or Python objects in between.
+        The array is only valid until the next reply arrives: consume or copy it first.
+        """
+        read_command = f"rcb read_binary_values {self.rem_id} {datatype} {is_big_endian} {header_fmt} {expect_termination} {data_points} {chunk_size}"
+        binary_resp = self.comm_man.remote_write_read_binary_view(f"rc write {self.rem_id} {command}", read_command)
+        if binary_resp:
+            return binary_block_to_array(binary_resp, datatype, is_big_endian)
+        else:
+            return np.zeros(0, np.dtype(datatype))
+
+    def batch(self):
+        return self.comm_man.batch()
+
+    def enable_srq(self):
+        """
+        Asks the server to push this instrument's service requests to us.
+        Returns False if events are not available, in which case poll read_stb.
+        """
+        events = self.comm_man.StartEvents()
+        if events is None:
+            return False
+        events.flag(self.resource_name).clear()
+        reply = self.comm_man.remote_query(f"rc enable_srq {self.rem_id}")
+        return bool(reply) and not (("Error" in reply) or ("error" in reply))
+
+    def wait_for_srq(self, timeout=25000):
+        # Timeout in ms, like pyvisa. Returns True if a service request arrived
+        events = self.comm_man.root.events
+        if events is None:
+            return False
+        flag = events.flag(self.resource_name)
+        if flag.wait(None if timeout is None else timeout/1000.0):
+            flag.clear()
+            return True
+        return False
+
+    def wake_srq(self):
+        # Makes a pending wait_for_srq return True early, as if a service request had arrived
+        events = self.comm_man.root.events
+        if events is not None:
+            events.flag(self.resource_name).set()
+
     def read_stb(self):
-        return commsMan.remote_query(f"rc read_stb {self.rem_id}", 1048576)
+        return self.comm_man.remote_query(f"rc read_stb {self.rem_id}", 1048576)
     
     ## Serial support ##
     # TODO
 
-    ## TODO: implement all properties/methods
\ No newline at end of file
+    ## TODO: implement all properties/methods
+
+
+class AsyncCommsManager():
+    """
+    asyncio counterpart of CommsManager, speaking the same protocol over asyncio streams.
+    The remote_* methods are coroutines. Replies carry no request id, so requests on one
+    connection are serialized by a lock, but they never block the caller's thread.
+
+    The blocking instrument drivers also accept it: call start_loop() first, so the event
+    loop runs on a background thread, and they will use the blocking adapter, which submits
+    every request to that loop. submit() schedules any coroutine on it from other threads.
+    """
+    def __init__(self):
+        self.remhost_addr = "127.0.0.1"
+        self.remhost_port = 8080
+        self.reader = None
+        self.writer = None
+        self.commsOK = False
+        self.framed = False
+        self.batching = False
+        self.negotiation_timeout = 2.0
+        self.lock = None
+        self.loop = None
+        self.loop_thread = None
+        self._blocking = None
+        self.pool = {}
+
+    def start_loop(self):
+        if self.loop_thread is None:
+            self.loop = asyncio.new_event_loop()
+            self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+            self.loop_thread.start()
+        return self.loop
+
+    def stop_loop(self):
+        if self.loop_thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop_thread.join()
+            self.loop_thread = None
+
+    def submit(self, coro):
+        # Returns a concurrent.futures.Future
+        return asyncio.run_coroutine_threadsafe(coro, self.start_loop())
+
+    def run(self, coro):
+        if threading.current_thread() is self.loop_thread:
+            raise RuntimeError("Blocking call made from the communications event loop. Await the coroutine instead.")
+        return self.submit(coro).result()
+
+    @property
+    def blocking(self):
+        if self._blocking is None:
+            self._blocking = BlockingCommsManager(self)
+        return self._blocking
+
+    async def StartCommunications(self, ip, port):
+        self.commsOK = False
+        self.framed = False
+        self.batching = False
+        self.remhost_addr = ip
+        self.remhost_port = port
+        self.lock = asyncio.Lock()
+        try:
+            self.reader, self.writer = await asyncio.open_connection(ip, port)
+            resp = await self.reader.read(1024)
+            if resp:
+                print(resp.decode("Latin1"))
+                self.commsOK = True
+        except:
+            print("Error connecting to the selected server! Check if it is running on the remote machine, and if IP address and port are correct.")
+
+        if self.commsOK:
+            self.framed = await self.Negotiate("framing")
+            self.batching = await self.Negotiate("batch")
+
+        return self.commsOK
+
+    async def CloseCommunications(self):
+        for conn in self.pool.values():
+            await conn.CloseCommunications()
+        self.pool = {}
+        try:
+            if self.writer is not None:
+                self.writer.close()
+                await self.writer.wait_closed()
+            self.commsOK = False
+            self.framed = False
+            self.batching = False
+        except:
+            print("Error closing the connection. Maybe it was already down?")
+
+    async def RestartCommunications(self, ip, port):
+        await self.CloseCommunications()
+        return await self.StartCommunications(ip, port)
+
+    async def GetConnection(self, key):
+        # Dedicated connection for key (a resource name), running on the same event loop
+        if key not in self.pool:
+            conn = AsyncCommsManager()
+            conn.loop = self.loop
+            conn.loop_thread = self.loop_thread
+            try:
+                ok = await asyncio.wait_for(conn.StartCommunications(self.remhost_addr, self.remhost_port), self.negotiation_timeout)
+            except asyncio.TimeoutError:
+                ok = False
+            if ok:
+                self.pool[key] = conn
+            else:
+                print(f"Could not open a dedicated connection for {key}. Sharing the main one.")
+                return self
+        return self.pool[key]
+
+    async def Negotiate(self, feature):
+        enabled = False
+        try:
+            resp = await asyncio.wait_for(self._transact(f"srv {feature} 1", 1024), self.negotiation_timeout)
+            enabled = (resp.decode("Latin1").strip() == f"{feature} 1")
+        except asyncio.TimeoutError:
+            pass
+        except:
+            print(f"Error negotiating '{feature}' with the server. Leaving it disabled.")
+
+        return enabled
+
+    async def ResetVisa(self):
+        return await self.remote_write("srv visarst")
+
+    async def _recv_unframed(self, length):
+        # The termination sent after a block may arrive at the start of the next reply
+        resp = await self.reader.read(length)
+        while resp and resp.lstrip(b"\r\n") == b"":
+            resp = await self.reader.read(length)
+        return resp.lstrip(b"\r\n")
+
+    async def _recv_block_unframed(self, length):
+        resp = await self._recv_unframed(length)
+        # readexactly raises IncompleteReadError if the server closes mid-header
+        if resp[:1] == b"#" and len(resp) < 2:
+            resp += await self.reader.readexactly(2 - len(resp))
+        if resp[:1] == b"#" and resp[1:2].isdigit() and len(resp) < 2 + int(resp[1:2]):
+            resp += await self.reader.readexactly(2 + int(resp[1:2]) - len(resp))
+        offset, data_length = parse_block_header(resp)
+        if offset > 0 and offset + data_length > len(resp):
+            resp += await self.reader.readexactly(offset + data_length - len(resp))
+        return resp
+
+    async def _transact(self, command, length=1048576, block=False):
+        async with self.lock:
+            return await self._exchange(command, length, block)
+
+    async def _exchange(self, command, length=1048576, block=False):
+        # One request/reply exchange. The caller holds self.lock
+        self.writer.write(command.encode('Latin1'))
+        await self.writer.drain()
+        if self.framed:
+            size, = frame_header.unpack(await self.reader.readexactly(frame_header.size))
+            return await self.reader.readexactly(size)
+        elif block:
+            return await self._recv_block_unframed(length)
+        else:
+            return await self._recv_unframed(length)
+
+    async def remote_write_batch(self, commands):
+        # Returns the success of each command
+        if self.batching and self.commsOK:
+            try:
+                resp = (await self._transact("srv batch\n" + "\n".join(commands))).decode("Latin1").strip().split("\n")
+                results = []
+                for i in range(len(commands)):
+                    status = resp[i].strip() if i < len(resp) else "Error: no status received"
+                    ok = not (("Error" in status) or ("error" in status))
+                    if not ok: print(f"{commands[i]}: {status}")
+                    results.append(ok)
+                return results
+            except:
+                print("Error communicating with the server. Try restarting the connection and/or the server.")
+                return [False]*len(commands)
+        else:
+            return [await self.remote_write(command) for command in commands]
+
+    async def remote_write(self, command):
+        if self.commsOK:
+            try:
+                resp = (await self._transact(command, 1024)).decode("Latin1")
+                if resp:
+                    if ("Error" in resp) or ("error" in resp):
+                        print(resp)
+                        return False
+                    return True
+                else:
+                    return False
+            except:
+                print("Error communicating with the server. Try restarting the connection and/or the server.")
+                return False
+        else:
+            print("Communications are down. Try (re)starting the communications and/or the server.")
+            return False
+
+    async def remote_read_binary_values(self, command, length=1048576):
+        if self.commsOK:
+            try:
+                resp = await self._transact(command, length, block=True)
+                if resp:
+                    if resp[:1] != b"#":
+                        resp_l1 = resp.decode("Latin1")
+                        if ("Error" in resp_l1) or ("error" in resp_l1): print(resp_l1)
+                    return resp
+                else:
+                    return False
+            except:
+                print("Error communicating with the server. Try restarting the connection and/or the server.")
+                return False
+        else:
+            print("Communications are down. Try (re)starting the communications and/or the server.")
+            return False
+
+    async def remote_write_read_binary(self, command, read_command, length=1048576):
+        # Writes command, then reads read_command's binary reply, holding the connection
+        # in between so no other coroutine's request gets its reply mixed up with them
+        if self.commsOK:
+            try:
+                async with self.lock:
+                    status = (await self._exchange(command, 1024)).decode("Latin1")
+                    if ("Error" in status) or ("error" in status): print(status)
+                    resp = await self._exchange(read_command, length, block=True)
+                if resp:
+                    if resp[:1] != b"#":
+                        resp_l1 = resp.decode("Latin1")
+                        if ("Error" in resp_l1) or ("error" in resp_l1): print(resp_l1)
+                    return resp
+                else:
+                    return False
+            except:
+                print("Error communicating with the server. Try restarting the connection and/or the server.")
+                return False
+        else:
+            print("Communications are down. Try (re)starting the communications and/or the server.")
+            return False
+
+    async def remote_query(self, command, length=1048576):
+        if self.commsOK:
+            try:
+                resp = (await self._transact(command, length)).decode("Latin1").strip()
+                if resp:
+                    if ("Error" in resp) or ("error" in resp): print(resp)
+                    return resp
+                else:
+                    return False
+            except:
+                print("Error communicating with the server. Try restarting the connection and/or the server.")
+                return False
+        else:
+            print("Communications are down. Try (re)starting the communications and/or the server.")
+            return False
+
+class BlockingCommsManager(CommsManager):
+    """
+    CommsManager interface on top of an AsyncCommsManager running its own loop thread,
+    so blocking code (like the instrument drivers) can share the asynchronous connection.
+    """
+    def __init__(self, async_comm_man):
+        self.async_comm_man = async_comm_man
+        self.batch_depth = 0
+        self.batch_queue = []
+        self.batch_errors = []
+        self.root = self
+        self.events = None
+        self.lock = threading.RLock()
+
+    def __del__(self):
+        pass
+
+    @property
+    def commsOK(self):
+        return self.async_comm_man.commsOK
+
+    @property
+    def batching(self):
+        return self.async_comm_man.batching
+
+    @property
+    def framed(self):
+        return self.async_comm_man.framed
+
+    def StartCommunications(self, ip, port):
+        return self.async_comm_man.run(self.async_comm_man.StartCommunications(ip, port))
+
+    def CloseCommunications(self):
+        self.async_comm_man.run(self.async_comm_man.CloseCommunications())
+
+    def GetConnection(self, key):
+        return self.async_comm_man.run(self.async_comm_man.GetConnection(key)).blocking
+
+    def StartEvents(self):
+        # No pushed events over the asyncio client, completion is polled
+        return None
+
+    def _transact(self, command, length=1048576, block=False):
+        return self.async_comm_man.run(self.async_comm_man._transact(command, length, block))
+
+    def _write_read_binary_locked(self, command, read_command, length):
+        # As one transaction on the loop, so coroutines sharing the connection can't get in between
+        return self.async_comm_man.run(self.async_comm_man.remote_write_read_binary(command, read_command, length))
+
+class AsyncResourceManager():
+    def __init__(self, comm_man, per_resource=True):
+        self.comm_man = comm_man
+        self.per_resource = per_resource
+
+    async def list_resources(self, query="?*::INSTR"):
+        rem_list = await self.comm_man.remote_query(f"rm list_resources {query}")
+        if rem_list:
+            return rem_list.split("\n")
+
+    async def open_resource(self, resource_name, access_mode=None, open_timeout=None, **kwargs):
+        access_mode, open_timeout = open_defaults(access_mode, open_timeout)
+        if self.per_resource:
+            conn = await self.comm_man.GetConnection(resource_name)
+        else:
+            conn = self.comm_man
+        reply = await conn.remote_query(f"rm open_resource {resource_name} {access_mode} {open_timeout}")
+        try:
+            return parse_open_reply(reply, resource_name, AsyncResource(conn))
+        except:
+            print(f"Error received: {reply}")
+            dev = AsyncResource(conn)
+            dev.rem_id = None
+            return dev
+
+class AsyncResource():
+    """
+    Coroutine version of Resource. Attribute setters can't be awaited,
+    so use set_timeout() and friends instead of the properties.
+    """
+    def __init__(self, comm_man, resource=None):
+        self.comm_man = comm_man
+        self.timeout = 0
+        self.read_termination = ""
+        self.write_termination = ""
+        self.resource_name = ""
+        self.rem_id = 0
+        if resource is not None:
+            # Share an already opened (blocking) Resource
+            self.rem_id = resource.rem_id
+            self.resource_name = resource.resource_name
+            self.timeout = resource.timeout
+            self.read_termination = resource.read_termination
+            self.write_termination = resource.write_termination
+
+    async def set_timeout(self, new_timeout):
+        self.timeout = new_timeout
+        return await self.comm_man.remote_write(f"rc timeout {self.rem_id} {new_timeout}")
+
+    async def set_read_termination(self, new_read_termination):
+        self.read_termination = new_read_termination
+        return await self.comm_man.remote_write(f"rc read_termination {self.rem_id} {new_read_termination}")
+
+    async def set_write_termination(self, new_write_termination):
+        self.write_termination = new_write_termination
+        return await self.comm_man.remote_write(f"rc write_termination {self.rem_id} {new_write_termination}")
+
+    async def close(self):
+        if self.rem_id is None:
+            return False
+        return await self.comm_man.remote_write(f"rc close {self.rem_id}")
+
+    async def open(self):
+        self.rem_id = int(await self.comm_man.remote_query(f"rc open {self.resource_name}"))
+
+    async def clear(self):
+        return await self.comm_man.remote_write(f"rc clear {self.rem_id}")
+
+    async def write(self, command):
+        return await self.comm_man.remote_write(f"rc write {self.rem_id} {command}")
+
+    async def write_many(self, commands):
+        return await self.comm_man.remote_write_batch([f"rc write {self.rem_id} {command}" for command in commands])
+
+    async def read(self, length=1048576):
+        return await self.comm_man.remote_query(f"rc read {self.rem_id}", length)
+
+    async def query(self, command, length=1048576):
+        return await self.comm_man.remote_query(f"rc query {self.rem_id} {command}", length)
+
+    async def query_binary_values(self, command, datatype='f', is_big_endian=False, header_fmt='ieee', expect_termination=True, data_points=-1, chunk_size=None, container=list):
+        read_command = f"rcb read_binary_values {self.rem_id} {datatype} {is_big_endian} {header_fmt} {expect_termination} {data_points} {chunk_size}"
+        binary_resp = await self.comm_man.remote_write_read_binary(f"rc write {self.rem_id} {command}", read_command)
+        if not binary_resp:
+            return container([])
+        elif container is np.array or container is np.ndarray:
+            return binary_block_to_array(binary_resp, datatype, is_big_endian)
+        else:
+            import pyvisa.util
+            offset, length = parse_block_header(binary_resp)
+            length = min(length, len(binary_resp) - offset)
+            return container(pyvisa.util.from_binary_block(binary_resp, offset=offset, data_length=length, datatype=datatype, is_big_endian=is_big_endian))
+
+    async def read_stb(self):
+        return await self.comm_man.remote_query(f"rc read_stb {self.rem_id}", 1048576)
@@ -1,10 +1,10 @@
 import remotevisa
 
-remotevisa.commsMan = remotevisa.CommsManager()
-remotevisa.commsMan.StartCommunications("143.106.153.67", 8080)
-# remotevisa.commsMan.ResetVisa()
+commsMan = remotevisa.CommsManager()
+commsMan.StartCommunications("143.106.153.67", 8080)
+# commsMan.ResetVisa()
 
-rm = remotevisa.ResourceManager()
+rm = remotevisa.ResourceManager(commsMan)
 res_list = rm.list_resources()
 print(res_list)
 dev0_id = res_list[0]
@@ -19,4 +19,4 @@ print(dev1.query("*IDN?"))
 dev0.close()
 dev1.close()
 
-remotevisa.commsMan.CloseCommunications()
\ No newline at end of file
+commsMan.CloseCommunications()
\ No newline at end of file
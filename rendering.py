@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+Created on Sun Oct 18 13:05 2026
+
+@author: pfjarschel
+"""
+
+import time
+import numpy as np
+
+
+def decimate_minmax(x, y, bins):
+    """
+    Reduces (x, y) to about 2*bins points, keeping the minimum and the maximum of y
+    in each of bins consecutive chunks, so peaks and the noise envelope survive.
+    """
+    n = len(y)
+    if bins <= 0 or n <= 2*bins:
+        return x, y
+
+    k = int(np.ceil(n/bins))
+    nb = n//k
+    m = nb*k
+    tail = 1 if m < n else 0
+
+    x_dec = np.empty(2*(nb + tail))
+    y_dec = np.empty(2*(nb + tail))
+    chunks = y[:m].reshape(nb, k)
+    chunks.min(1, out=y_dec[0:2*nb:2])
+    chunks.max(1, out=y_dec[1:2*nb:2])
+    x_dec[0:2*nb:2] = x[0:m:k]
+    x_dec[1:2*nb:2] = x[k - 1:m:k]
+    if tail:
+        y_dec[-2] = y[m:].min()
+        y_dec[-1] = y[m:].max()
+        x_dec[-2] = x[m]
+        x_dec[-1] = x[-1]
+
+    return x_dec, y_dec
+
+
+class BlitPlot():
+    """
+    Draws one line on a matplotlib axes, fast enough to follow the sweeps. The line is
+    decimated to the visible part of the axes width and blitted over a cached
+    background, so each update costs the same whatever the record length. The rest of
+    the figure is only redrawn when something in it changed (limits, labels, a resize).
+    Autoscaling keeps the matplotlib autoscale state (zooming with the toolbar turns it
+    off), but limits only move when the data leaves them or shrinks well inside them.
+    """
+    margin = 0.05
+    shrink = 0.5
+
+    def __init__(self, figure, ax, line):
+        self.figure = figure
+        self.ax = ax
+        self.line = line
+        self.canvas = figure.canvas
+        self.background = None
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+
+        # Left out of normal draws, and drawn by us on top of the background
+        self.line.set_animated(True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def SetLabels(self, xlabel, ylabel):
+        # Only touch the axes (forcing a full redraw) when a label actually changes
+        if self.ax.get_xlabel() != xlabel:
+            self.ax.set_xlabel(xlabel)
+        if self.ax.get_ylabel() != ylabel:
+            self.ax.set_ylabel(ylabel)
+
+    def SetData(self, x, y):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.Render()
+
+    def Render(self):
+        self.Autoscale()
+        if self.background is None or self.figure.stale:
+            # The draw_event handler caches the new background and draws the line
+            self.background = None
+            self.canvas.draw_idle()
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_line()
+            self.canvas.blit(self.ax.bbox)
+
+    def Autoscale(self):
+        if len(self.x) == 0:
+            return
+        if self.ax.get_autoscalex_on():
+            lims = self._fit(self.ax.get_xlim(), self.x)
+            if lims is not None:
+                self.ax.set_xlim(*lims, auto=None)
+        if self.ax.get_autoscaley_on():
+            lims = self._fit(self.ax.get_ylim(), self.y)
+            if lims is not None:
+                self.ax.set_ylim(*lims, auto=None)
+
+    def _fit(self, current, data):
+        # New (lo, hi) if data doesn't fit in current, or fills too little of it. Else None
+        lo = np.nanmin(data)
+        hi = np.nanmax(data)
+        if not (np.isfinite(lo) and np.isfinite(hi)):
+            return None
+        cur_lo, cur_hi = min(current), max(current)
+        span = hi - lo
+        if lo >= cur_lo and hi <= cur_hi and span >= self.shrink*(cur_hi - cur_lo):
+            return None
+        if span == 0:
+            span = abs(hi) if hi != 0 else 1.0
+        lims = (lo - self.margin*span, hi + self.margin*span)
+        if np.allclose(lims, (cur_lo, cur_hi)):
+            return None
+        return lims
+
+    def _draw_line(self):
+        # Decimate what is inside the current x limits to about two points per pixel column
+        x, y = self.x, self.y
+        if len(x) > 1:
+            lo, hi = sorted(self.ax.get_xlim())
+            if x[0] <= x[-1]:
+                i0 = max(np.searchsorted(x, lo) - 1, 0)
+                i1 = np.searchsorted(x, hi) + 1
+            else:
+                i0 = max(len(x) - np.searchsorted(x[::-1], hi) - 1, 0)
+                i1 = len(x) - np.searchsorted(x[::-1], lo) + 1
+            x, y = decimate_minmax(x[i0:i1], y[i0:i1], int(self.ax.bbox.width))
+        self.line.set_data(x, y)
+        self.ax.draw_artist(self.line)
+
+    def _on_draw(self, event):
+        if self.canvas.is_saving():
+            # Saved figures include the line by themselves
+            return
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_line()
+
+
+class RenderScheduler():
+    """
+    Coalesces redraw requests: any number of Request() calls between two frames
+    result in a single call to render, and frames are at least 1/fps seconds apart.
+    render should draw whatever is newest at that moment, so stale frames are
+    dropped instead of queued. Runs on the canvas' own timer (the GUI thread).
+    """
+    def __init__(self, canvas, render, fps=20.0):
+        self.render = render
+        self.fps = fps
+        self.pending = False
+        self.last = 0.0
+        self.timer = canvas.new_timer()
+        self.timer.single_shot = True
+        self.timer.add_callback(self._fire)
+
+    def SetFPS(self, fps):
+        self.fps = max(fps, 0.1)
+
+    def Request(self):
+        if not self.pending:
+            self.pending = True
+            wait = max(0.0, self.last + 1.0/self.fps - time.perf_counter())
+            self.timer.interval = int(1000*wait)
+            self.timer.start()
+
+    def _fire(self):
+        self.pending = False
+        self.last = time.perf_counter()
+        self.render()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""
+Created on Sun Oct 18 15:30 2026
+
+@author: pfjarschel
+
+Startup time of the HM-BOSA GUI. Every run starts a fresh interpreter and times, from
+its start:
+    import:  LCO-HMBOSA.py and everything it imports at load
+    window:  the main window is on screen and responsive
+    graph:   the plot is ready
+    devices: the instruments answered (or failed to), if within --devices-timeout
+
+    python startup_benchmark.py --runs 5 --max-window 1.5 [--offscreen]
+
+Exits with 1 when the median time to the window is above --max-window seconds, so it
+can be used to catch startup regressions.
+"""
+
+import time
+t_process = time.perf_counter()
+
+import sys, os, json
+import argparse
+import subprocess
+import importlib.util
+import numpy as np
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+
+def child(args):
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+
+    spec = importlib.util.spec_from_file_location("hmbosa", os.path.join(here, "LCO-HMBOSA.py"))
+    gui = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gui)
+    t_import = time.perf_counter() - t_process
+
+    app = QApplication(sys.argv)
+    # Dismiss the device error dialog, if any, so an unreachable lab doesn't block the run
+    dismiss = QTimer()
+    dismiss.timeout.connect(lambda: app.activeModalWidget() and app.activeModalWidget().close())
+    dismiss.start(50)
+
+    w = gui.MainWindow()
+    t_window = time.perf_counter() - t_process
+
+    t0 = time.time()
+    while (w.t_graph == 0.0 or not w.inited) and time.time() - t0 < args.devices_timeout:
+        app.processEvents()
+        time.sleep(0.001)
+
+    offset = w.t_start - t_process
+    result = {"import": t_import, "window": t_window,
+              "graph": w.t_graph + offset if w.t_graph else None,
+              "devices": w.t_devices + offset if w.inited else None}
+    print(json.dumps(result), flush=True)
+    # Skip closeEvent, which would stop the instruments and overwrite the saved settings
+    os._exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HM-BOSA GUI startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-window", type=float, default=None, help="fail if the median time to the window is above this (s)")
+    parser.add_argument("--devices-timeout", type=float, default=10.0, help="how long to wait for the instruments (s)")
+    parser.add_argument("--offscreen", action="store_true", help="use Qt's offscreen platform (no display needed)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return 0
+
+    env = dict(os.environ)
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    command = [sys.executable, os.path.abspath(__file__), "--child", "--devices-timeout", str(args.devices_timeout)]
+
+    results = []
+    for i in range(args.runs):
+        out = subprocess.run(command, cwd=here, env=env, capture_output=True, text=True).stdout
+        lines = [l for l in out.splitlines() if l.startswith("{")]
+        if len(lines) == 0:
+            print(f"Run {i + 1} failed:\n{out}")
+            return 1
+        results.append(json.loads(lines[-1]))
+
+    print(f"{'stage':>8} {'median (s)':>11} {'min (s)':>8} {'max (s)':>8}")
+    medians = {}
+    for stage in ["import", "window", "graph", "devices"]:
+        values = [r[stage] for r in results if r[stage] is not None]
+        if len(values) == 0:
+            print(f"{stage:>8} {'-':>11} {'-':>8} {'-':>8}")
+            continue
+        medians[stage] = np.median(values)
+        print(f"{stage:>8} {medians[stage]:11.3f} {min(values):8.3f} {max(values):8.3f}")
+
+    if args.max_window is not None and medians.get("window", np.inf) > args.max_window:
+        print(f"Window took {medians['window']:.3f} s, above the {args.max_window:.3f} s limit")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
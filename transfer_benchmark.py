@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+Created on Sun Oct 18 17:10 2026
+
+@author: pfjarschel
+
+Waveform transfer throughput of the oscilloscope over the remote VISA link, for each
+format the driver can read: ASCii (GetDataY_ASC), BYTE and WORD (GetWaveformCodes).
+The same stopped record is read every time, so only the transfer is measured.
+
+    python transfer_benchmark.py --runs 10 --chan 1 [--ip 143.106.153.67 --port 8080]
+"""
+
+import sys, time
+import argparse
+import numpy as np
+
+from remotevisa import CommsManager
+from keysightDSOX1200 import KeysightDSOX1200
+import bosa
+
+
+def time_transfer(read, runs):
+    # Seconds per call of read(), and what the last call returned
+    times = []
+    for i in range(runs):
+        t0 = time.perf_counter()
+        data = read()
+        times.append(time.perf_counter() - t0)
+    return np.array(times), data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HM-BOSA waveform transfer benchmark")
+    parser.add_argument("--ip", default=bosa.server_ip, help="remote VISA server address")
+    parser.add_argument("--port", type=int, default=bosa.server_port, help="remote VISA server port")
+    parser.add_argument("--chan", type=int, default=1, help="oscilloscope channel")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--no-ascii", action="store_true", help="skip the (slow) ASCii transfers")
+    args = parser.parse_args(argv)
+
+    comm_man = CommsManager()
+    if not comm_man.StartCommunications(args.ip, args.port):
+        return 1
+    osc = KeysightDSOX1200(True, comm_man)
+    osc.connect(usb_hint=bosa.load_resource_cache().get("osc", ""))
+    if not osc.devOK:
+        print("Error communicating with the oscilloscope!")
+        comm_man.CloseCommunications()
+        return 1
+    osc.dev.timeout = 30000
+    osc.Stop()
+
+    transfers = [("BYTE", lambda: osc.GetWaveformCodes(args.chan, fmt="BYTE")[1]),
+                 ("WORD", lambda: osc.GetWaveformCodes(args.chan, fmt="WORD")[1])]
+    if not args.no_ascii:
+        if osc.dev.comm_man.framed:
+            transfers.append(("ASCii", lambda: osc.GetDataY_ASC(args.chan)))
+        else:
+            # Unframed text replies are a single recv, which truncates a record this long
+            print("The server doesn't frame its replies, so ASCii transfers would be cut short. Skipping them.")
+
+    print(f"Auto format for the current acquisition type: {osc.TransferFormat()}")
+    print(f"{'format':>6} {'points':>8} {'bytes':>9} {'median (ms)':>12} {'MB/s':>7} {'Mpts/s':>7}")
+    for name, read in transfers:
+        times, data = time_transfer(read, args.runs)
+        points = len(data)
+        if name == "ASCii":
+            # About 14 characters per sample ("-1.23456E-01,")
+            nbytes = 14*points
+        else:
+            nbytes = points*data.dtype.itemsize
+        t = np.median(times)
+        print(f"{name:>6} {points:8d} {nbytes:9d} {1000*t:12.2f} {nbytes/t/1e6:7.2f} {points/t/1e6:7.3f}")
+
+    osc.close()
+    comm_man.CloseCommunications()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())